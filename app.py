@@ -1,27 +1,31 @@
 # app.py 라이브러리 로드
-import openai
 import streamlit as st
 import gspread
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib import font_manager as fm, rcParams
-from datetime import datetime, timezone
-from typing import Dict, Any, List, Tuple
-import os, time, json, math, textwrap, hashlib, requests
-from oauth2client.service_account import ServiceAccountCredentials
-from itertools import combinations
-import io
-
-# 기본 설정
-openai.api_key = st.secrets["openai"]["api_key"]
-font_path = os.path.join("fonts", "NanumGothic.ttf")
-fm.fontManager.addfont(font_path)
-prop = fm.FontProperties(fname=font_path)
-font_name = prop.get_name()
-rcParams["font.family"] = font_name
-plt.rc('axes', unicode_minus=False)
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import hashlib, requests
+from gspread.utils import rowcol_to_a1
+from regression import SEARCH_STRATEGIES, IncrementalFit, QuadraticModel, TripleSearch, search_triple
+from sheet_store import SheetStore, sheet_key
+from sheet_versions import PROBE_TTL, SheetVersions
+from append_queue import AppendQueue, SENT, PENDING, FAILING
+from collector import (ViewCountCollector, RunnerLease, DEFAULT_INTERVAL_MINUTES,
+                       DEFAULT_TARGET_VIEWS, DEFAULT_MAX_AGE_DAYS)
+from youtube_client import YouTubeClient, QuotaExceeded
+from user_index import UserIndex
+from view_data import ViewPartitions
+from simulation import UNIT_WON, DEFAULT_BUDGETS, DEFAULT_GAMMAS, DEFAULT_PS, budget_for_target, whatif_grid
+from charts import (cached_png, data_hash, draw_selected, draw_detail, draw_power,
+                    selected_chart, detail_chart, power_chart, heatmap_chart, downsample, MAX_POINTS)
+from evaluation import FitEvaluator
+from class_report import ClassReport
+from gpt_cache import ResponseCache
+from gpt_jobs import JobQueue, DONE, FAILED, MAX_WORKERS, TOKENS_PER_MINUTE, estimate_tokens
+from chat_context import ChatContext, SUMMARY_MAX_TOKENS, stream_text
+from teacher_digest import SHEET_LAYOUTS, BatchSummarizer, DigestResult, entries_from_rows, estimate_cost
+
 # 타이틀 설정
 st.set_page_config("📈 유튜브 조회수 분석기", layout="centered")
 st.title("📈 유튜브 조회수 분석기")
@@ -37,11 +41,24 @@ if "step" not in st.session_state:
     st.session_state["step"] = 1  # 수업 단계
 
 
-# 구글 시트 인증
-scope = ["https://spreadsheets.google.com/feeds","https://www.googleapis.com/auth/drive"]
-creds_dict = st.secrets["gcp_service_account"]
-creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_dict, scope)
-gc = gspread.authorize(creds)
+# 프로세스 단위 리소스 (재실행마다 다시 만들지 않음)
+# 인증·클라이언트 생성은 처음 쓸 때 한 번만 하고, 무거운 라이브러리(openai, oauth2client)도 그때 import
+@st.cache_resource(show_spinner=False)
+def get_gspread_client() -> gspread.Client:
+    """
+    서비스 계정으로 인증한 gspread 클라이언트.
+    액세스 토큰은 만료되면 요청할 때 자동으로 갱신됩니다.
+    """
+    from oauth2client.service_account import ServiceAccountCredentials
+    scope = ["https://spreadsheets.google.com/feeds","https://www.googleapis.com/auth/drive"]
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(st.secrets["gcp_service_account"], scope)
+    return gspread.authorize(creds)
+
+@st.cache_resource(show_spinner=False)
+def get_openai():
+    """OpenAI 클라이언트 (연결 풀 공유)."""
+    from openai import OpenAI
+    return OpenAI(api_key=st.secrets["openai"]["api_key"])
 
 yt_conf  = st.secrets["sheets"]["youtube"]  # 조회 기록용 시트
 usr_conf = st.secrets["sheets"]["users"]    # 회원DB용 시트
@@ -52,68 +69,144 @@ yt_name  = yt_conf["sheet_name"]
 usr_id    = usr_conf["spreadsheet_id"]
 usr_name = usr_conf["sheet_name"]
 
-# Sheets 도우미 (429 백오프 안정성) 및 캐시 초기화
+# Sheets 도우미 (429 백오프 안정성) 및 로컬 미러
 
-def safe_append(ws, row: List[Any]):
-    """429 대응 append_row."""
-    for wait in (0, 2, 4, 8, 16):
-        try:
-            ws.append_row(row, value_input_option="USER_ENTERED")
-            return
-        except gspread.exceptions.APIError as e:
-            if e.response.status == 429:
-                time.sleep(wait)
-            else:
-                raise
-    st.error("❌ Google Sheets 쿼터 초과 – 잠시 후 다시 시도하세요.")
+@st.cache_resource(show_spinner=False)
+def get_sheet_store() -> SheetStore:
+    """프로세스 전체가 공유하는 시트 로컬 미러 (SQLite)."""
+    return SheetStore(sync_ttl=PROBE_TTL)
+
+@st.cache_resource(show_spinner=False)
+def get_sheet_versions() -> SheetVersions:
+    """스프레드시트별 수정 시각 조회 (짧은 TTL 캐시, 프로세스당 하나)."""
+    return SheetVersions(get_gspread_client)
 
-@st.cache_data(ttl=300, show_spinner=False)
-def load_sheet_records(_spreadsheet_id: str, _sheet_name: str) -> list:
+def sync_sheet(key: str, force: bool = False) -> int:
     """
-    구글 스프레드시트의 모든 레코드를 불러와 5분간 캐싱합니다.
-    429 에러 발생 시 최대 5번까지 지수 백오프를 시도합니다.
+    시트의 로컬 미러를 최신으로 맞춥니다.
+    스프레드시트 수정 시각이 지난 동기화 때와 같으면 값 조회 없이 로컬 데이터를 그대로 씁니다.
     """
-    for wait in (0, 1, 2, 4, 8):
-        try:
-            ws = gc.open_by_key(_spreadsheet_id).worksheet(_sheet_name)
-            return ws.get_all_records()
-        except gspread.exceptions.APIError as e:
-            if getattr(e, 'response', None) and e.response.status == 429:
-                time.sleep(wait)
-            else:
-                raise
-    return []
-
-@st.cache_data
-def load_user_records():
-    return load_sheet_records(usr_id, usr_name)
-
-@st.cache_data
-def load_yt_records():
-    return load_sheet_records(yt_id, yt_name)
+    spreadsheet_id = key.split("/", 1)[0]
+    return get_sheet_store().sync(key, lambda: open_worksheet(key), force,
+                                  change_token=lambda: get_sheet_versions().token(spreadsheet_id))
+
+@st.cache_resource(show_spinner=False)
+def open_worksheet(key: str) -> gspread.Worksheet:
+    """'스프레드시트ID/시트이름' 키로 워크시트 열기 (메타데이터 조회는 시트마다 한 번만)."""
+    spreadsheet_id, sheet_name = key.split("/", 1)
+    return get_gspread_client().open_by_key(spreadsheet_id).worksheet(sheet_name)
+
+@st.cache_resource(show_spinner=False)
+def get_append_queue() -> AppendQueue:
+    """시트 기록을 모아서 보내는 백그라운드 큐 (프로세스당 하나)."""
+    return AppendQueue(get_sheet_store(), open_worksheet)
+
+def safe_append(ws, row: List[Any]) -> int:
+    """
+    시트 기록을 묶음 전송 큐에 넣고 바로 돌아옵니다 (대기 행 id 반환).
+    append_rows 전송과 429 백오프는 백그라운드에서 처리되며,
+    대기 중인 행도 로컬 미러 읽기에는 바로 포함됩니다.
+    """
+    return get_append_queue().put(ws, row)
+
+def show_write_failures(where=st):
+    """계속 실패하는 시트 기록이 있으면 알립니다 (행은 버리지 않고 계속 재시도 중)."""
+    failing = get_append_queue().failing()
+    if failing:
+        names = ", ".join(key.split("/", 1)[1] for key in failing)
+        where.warning(f"⚠️ 스프레드시트 기록이 계속 실패하고 있습니다 ({names}). "
+                      "입력한 내용은 보관 중이며 자동으로 다시 시도합니다.")
+
+@st.cache_resource(show_spinner=False)
+def get_collector() -> ViewCountCollector | None:
+    """
+    기록된 (학번, video_id) 쌍의 조회수를 주기적으로 수집하는 스케줄러 (프로세스당 하나).
+    여러 프로세스가 떠 있어도 임대(.cache/collector.sqlite3)를 가진 하나만 실제로 수집합니다.
+    secrets.toml의 [collector] enabled / interval_minutes / target_views / max_age_days로 설정합니다.
+    """
+    conf = st.secrets.get("collector", {})
+    if not conf.get("enabled", True):
+        return None
+    store = get_sheet_store()
+    key = sheet_key(yt_id, yt_name)
+
+    def pairs():
+        for r in store.records(key):
+            r = {str(k).strip().lower(): v for k, v in r.items()}
+            yield r.get("학번", ""), r.get("video_id", ""), r.get("timestamp"), r.get("viewcount")
+
+    def append_rows(rows):
+        queue, ws = get_append_queue(), open_worksheet(key)
+        for row in rows:
+            queue.put(ws, row)
+
+    interval = conf.get("interval_minutes", DEFAULT_INTERVAL_MINUTES)
+    collector = ViewCountCollector(get_youtube_client(), pairs, append_rows, interval,
+                                   conf.get("target_views", DEFAULT_TARGET_VIEWS),
+                                   conf.get("max_age_days", DEFAULT_MAX_AGE_DAYS),
+                                   RunnerLease(ttl=2 * interval * 60))
+    collector.start()
+    return collector
+
+@st.cache_resource(show_spinner=False)
+def get_user_index() -> UserIndex:
+    return UserIndex()
+
+def user_index() -> UserIndex:
+    """학번 색인. users 시트 버전이 바뀐 경우에만 로컬 미러에서 다시 만듭니다."""
+    store = get_sheet_store()
+    key = sheet_key(usr_id, usr_name)
+    sync_sheet(key)
+    idx = get_user_index()
+    idx.ensure(store.version(key), lambda: store.records(key))
+    return idx
+
+@st.cache_resource(show_spinner=False)
+def get_view_partitions() -> ViewPartitions:
+    return ViewPartitions()
+
+def student_views(sid: str, video_id: str | None = None) -> pd.DataFrame | None:
+    """학번(과 video_id)의 파싱·정렬된 조회수 기록. youtube 시트가 바뀐 경우에만 다시 계산합니다."""
+    store = get_sheet_store()
+    key = sheet_key(yt_id, yt_name)
+    # 시트에서 행을 고치거나 지운 뒤 로컬 미러가 어긋나 보이면 처음부터 다시 받기
+    if st.sidebar.button("시트 다시 불러오기", key="teacher_reload_sheets"):
+        for k in [key] + [sheet_key(yt_id, name) for name in SHEET_LAYOUTS]:
+            store.reset(k)
+        get_sheet_versions().invalidate(yt_id)
+        sync_sheet(key, force=True)
+    else:
+        sync_sheet(key)
+    parts = get_view_partitions()
+    parts.ensure(store.version(key), lambda: store.records(key))
+    return parts.get(sid, video_id)
 
 VIDEO_CRITERIA = {"max_views":1_000_000, "min_subs":100_000, "max_subs":3_000_000}
 
+@st.cache_resource(show_spinner=False)
+def get_youtube_client() -> YouTubeClient:
+    """세션·채널 구독자 캐시를 공유하는 YouTube API 클라이언트 (프로세스당 하나)."""
+    return YouTubeClient(YOUTUBE_API_KEY)
+
 @st.cache_data(ttl=3600, show_spinner=False)
 def fetch_video_details(vid: str) -> Dict[str,Any] | None:
-    url = ("https://www.googleapis.com/youtube/v3/videos"
-           f"?part=snippet,statistics&id={vid}&key={YOUTUBE_API_KEY}")
-    data = requests.get(url).json()
-    if not data.get("items"):
-        return None
-    item = data["items"][0]
-    stats = item["statistics"]
-    snippet = item["snippet"]
-    # 채널 구독자
-    chan = requests.get("https://www.googleapis.com/youtube/v3/channels"
-                        f"?part=statistics&id={snippet['channelId']}&key={YOUTUBE_API_KEY}").json()
-    subs = int(chan["items"][0]["statistics"].get("subscriberCount",0))
-    return {
-        "title" : snippet["title"],
-        "pub"   : snippet["publishedAt"][:10],
-        "views" : int(stats.get("viewCount",0)),
-        "subs"  : subs,
-    }
+    return get_youtube_client().video_details([vid]).get(vid)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_video_details_many(vids: Tuple[str, ...]) -> Dict[str, Dict[str,Any]]:
+    """여러 영상 정보를 한 번에 조회 (영상·채널 각각 묶음 요청)."""
+    return get_youtube_client().video_details(vids)
+
+def check_video_criteria(info: Dict[str,Any]) -> List[str]:
+    """VIDEO_CRITERIA를 만족하지 않는 이유 목록 (비어 있으면 통과)."""
+    reasons = []
+    if info['views'] >= VIDEO_CRITERIA['max_views']:
+        reasons.append(f"조회수 {VIDEO_CRITERIA['max_views']:,}회 이상")
+    if info['subs'] < VIDEO_CRITERIA['min_subs']:
+        reasons.append(f"구독자 {VIDEO_CRITERIA['min_subs']:,}명 미만")
+    if info['subs'] > VIDEO_CRITERIA['max_subs']:
+        reasons.append(f"구독자 {VIDEO_CRITERIA['max_subs']:,}명 초과")
+    return reasons
 
 def extract_video_id(url:str):
     import re
@@ -130,6 +223,23 @@ def step_header(title: str, goals: List[str], questions: List[str]):
     with st.expander("💡 핵심 발문"):
         st.markdown("\n".join([f"- {q}" for q in questions]))
 
+def png_download(label: str, file_name: str, key: str, cache_key: tuple, draw, *args, figsize=(6, 6)):
+    """
+    그래프 PNG는 다운로드를 요청할 때만 서버에서 그립니다.
+    준비 버튼을 누른 뒤 데이터가 바뀌면(cache_key가 달라지면) 다시 준비해야 합니다.
+    """
+    flag = f"png_ready_{key}"
+    if st.button(f"🖼️ {label} 준비", key=f"{flag}_btn"):
+        st.session_state[flag] = cache_key
+    if st.session_state.get(flag) == cache_key:
+        st.download_button(
+            label=label,
+            data=cached_png(cache_key, draw, *args, figsize=figsize),
+            file_name=file_name,
+            mime="image/png",
+            key=f"{flag}_dl"
+        )
+
 # 해시 함수 (비밀번호 해시 처리)
 def hash_password(pw: str) -> str:
     if not isinstance(pw, str) or pw == "":
@@ -147,25 +257,31 @@ def signup_ui():
         if not sid or not name or not pwd:
             st.error("학번, 이름, 비밀번호를 모두 입력해주세요.")
             return
+        # 로그인과 같은 형태(숫자)로 맞춰서 중복 확인·기록 ('01234'와 1234는 같은 학번)
+        try:
+            sid = str(int(sid))
+        except ValueError:
+            st.error("학번은 숫자여야 합니다.")
+            return
         pw_hash = hash_password(pwd)
         if pw_hash == "":
             st.error("비밀번호 처리에 문제가 발생했습니다.")
             return
-        usr_rows = load_sheet_records(usr_id, usr_name)
-        if any(r["학번"] == sid for r in usr_rows):
+        idx = user_index()
+        if sid in idx:
             st.error("이미 등록된 학번입니다.")
         else:
             sid_text=f"'{sid}"
-            ws = gc.open_by_key(usr_id).worksheet(usr_name)
+            ws = open_worksheet(sheet_key(usr_id, usr_name))
             safe_append(ws, [sid_text, name, pw_hash])
+            idx.add({"학번": sid, "이름": name, "암호(해시)": pw_hash},
+                    get_sheet_store().version(sheet_key(usr_id, usr_name)))
 
             st.success(f"{name}님, 회원가입이 완료되었습니다!")
 
 # 로그인 UI
 def login_ui():
-    st.cache_data.clear()
     st.header("🔐 로그인")
-    usr_rows = load_sheet_records(usr_id, usr_name)
     sid = st.text_input("학번", key="login_sid")
     pwd = st.text_input("비밀번호", type="password", key="login_pwd")
 
@@ -179,8 +295,8 @@ def login_ui():
 
         # 이미 해시된 비밀번호
         pw_hash = hash_password(pwd)
-        # 학번으로 회원 찾기
-        user = next((r for r in usr_rows if int(r["학번"]) == sid_int), None)
+        # 학번으로 회원 찾기 (색인 조회)
+        user = user_index().get(sid_int)
         if not user:
             st.error("❌ 등록되지 않은 학번입니다.")
             return
@@ -197,53 +313,108 @@ def login_ui():
         st.rerun()
         return
 
-# 조회수 API 호출
-def get_video_statistics(video_id):
-    import requests
-    url = (
-        f"https://www.googleapis.com/youtube/v3/videos"
-        f"?part=statistics&id={video_id}&key={YOUTUBE_API_KEY}"
-    )
-    r = requests.get(url)
-    st.write("🔗 요청 URL:", url)
-    st.write("📣 HTTP Status:", r.status_code)
-    try:
-        data = r.json()
-        st.write("📝 응답 JSON:", data)
-    except Exception as e:
-        st.write("⚠️ JSON 파싱 오류:", e)
+@st.cache_resource(show_spinner=False)
+def get_gpt_cache() -> ResponseCache:
+    """GPT 응답 캐시 (프로세스당 하나, .cache/gpt.sqlite3에 보관)."""
+    return ResponseCache()
+
+def gpt_chat(messages: List[Dict[str, str]], model: str = "gpt-3.5-turbo", **params) -> str:
+    """
+    같은 요청(모델·메시지·temperature 등)이면 저장된 응답을 쓰고,
+    여러 학생이 동시에 같은 요청을 보내면 API는 한 번만 호출합니다.
+    """
+    return get_gpt_cache().chat(get_openai(), model, messages, **params)
+
+@st.cache_resource(show_spinner=False)
+def get_job_queue() -> JobQueue:
+    """
+    GPT 요약 백그라운드 작업 큐 (프로세스당 하나).
+    secrets.toml의 [gpt_jobs] max_workers / tokens_per_minute로 설정합니다.
+    """
+    conf = st.secrets.get("gpt_jobs", {})
+    return JobQueue(conf.get("max_workers", MAX_WORKERS),
+                    conf.get("tokens_per_minute", TOKENS_PER_MINUTE))
+
+def submit_summary_job(job_key: str, messages: List[Dict[str, str]], ws, row: List[Any],
+                       model: str = "gpt-3.5-turbo", **params):
+    """
+    GPT 요약을 백그라운드 작업으로 보내고 작업 번호를 session_state[job_key]에 둡니다.
+    요약이 끝나면 row 끝에 요약을 붙여 시트 기록 큐에 넣고, 대기 행 id를 session_state[job_key_row]에 둡니다.
+    """
+    # 캐시·큐는 스크립트 스레드에서 꺼내 두고 워커에서는 객체만 사용
+    cache, append_queue, client = get_gpt_cache(), get_append_queue(), get_openai()
+    tokens = estimate_tokens(messages, params.get("max_tokens", 300))
+    queued = st.session_state[f"{job_key}_row"] = {}
+
+    def on_done(summary):
+        queued["pid"] = append_queue.put(ws, row + [summary])
+
+    st.session_state[job_key] = get_job_queue().submit(
+        lambda: cache.chat(client, model, messages, **params),
+        tokens, label=job_key, on_done=on_done)
+
+SUMMARY_POLL = 2   # 초: 요약·저장이 끝날 때까지 상태를 다시 확인하는 간격
+
+def _summary_state(job_key: str, job) -> Optional[str]:
+    """요약이 끝났으면 시트 저장 상태, 아직 요약 중이면 None."""
+    if job.status != DONE:
         return None
+    pid = st.session_state.get(f"{job_key}_row", {}).get("pid")
+    return get_append_queue().status(pid) if pid is not None else PENDING
+
+def _render_summary_job(job_key: str, job, title: str):
+    saved = _summary_state(job_key, job)
+    if saved is not None:
+        if saved == SENT:
+            st.success("요약 완료! 스프레드시트에 저장되었습니다.")
+        elif saved == FAILING:
+            st.warning("요약 완료! 스프레드시트 기록이 계속 실패하고 있어 자동으로 다시 시도하는 중입니다.")
+        else:
+            st.success("요약 완료! 스프레드시트 저장 대기 중입니다.")
+        st.markdown(title)
+        st.write(job.result)
+    elif job.status == FAILED:
+        st.error(f"GPT 요약 실패: {job.error} – 나중에 다시 시도해 주세요.")
+    else:
+        st.info("⏳ GPT가 요약하는 중입니다. 기다리는 동안 다른 활동을 계속해도 괜찮아요.")
+
+def _summary_settled(job_key: str, job) -> bool:
+    return job.status == FAILED or _summary_state(job_key, job) in (SENT, FAILING)
+
+@st.fragment(run_every=SUMMARY_POLL)
+def _poll_summary_job(job_key: str, title: str):
+    """요약·저장이 끝날 때까지 이 부분만 주기적으로 다시 그립니다."""
+    job = get_job_queue().get(st.session_state.get(job_key))
+    if job is None or _summary_settled(job_key, job):
+        st.rerun()   # 끝났으면 페이지를 다시 그려 주기적 확인을 멈춤
+    _render_summary_job(job_key, job, title)
+
+def show_summary_job(job_key: str, title: str = "**요약본**"):
+    """작업 상태 표시. 요약이나 시트 저장이 아직 진행 중이면 자동으로 다시 확인합니다."""
+    job = get_job_queue().get(st.session_state.get(job_key))
+    if job is None:
+        return
+    if _summary_settled(job_key, job):
+        _render_summary_job(job_key, job, title)
+    else:
+        _poll_summary_job(job_key, title)
 
-    items = data.get("items")
-    if items:
-        stats = items[0]["statistics"]
-        return {
-            "viewCount": int(stats.get("viewCount", 0)),
-            "likeCount": int(stats.get("likeCount", 0)),
-            "commentCount": int(stats.get("commentCount", 0)),
-        }
-    return None
 # GPT 요약가
-def summarize_discussion(text):
-    resp = openai.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role":"system", "content":"당신은 훌륭한 요약가입니다."},
-            {"role":"user", "content":f"다음 토의 내용을 짧고 깔끔하게 요약해주세요:\n\n{text}"}
-        ],
-        temperature=0.3,
-        max_tokens=300
-    )
-    return resp.choices[0].message.content.strip()
+def summary_messages(text: str) -> List[Dict[str, str]]:
+    return [
+        {"role":"system", "content":"당신은 훌륭한 요약가입니다."},
+        {"role":"user", "content":f"다음 토의 내용을 짧고 깔끔하게 요약해주세요:\n\n{text}"}
+    ]
+
 # GPT 대본 생성
 def generate_script_example(prompt: str) -> str:
     """
     역할/주제 프롬프트를 받아 1-2문단 분량 예시 발표 대본을 반환합니다.
     """
     try:
-        res = openai.chat.completions.create(
-            model   = "gpt-3.5-turbo",
-            messages= [
+        # 역할별 고정 프롬프트라 같은 모둠·반 학생들은 캐시된 예시를 함께 씀
+        return gpt_chat(
+            [
                 {"role": "system", "content":
                  "당신은 중3 학생 발표 대본을 도와주는 친절한 선생님입니다."},
                 {"role": "user",   "content": prompt}
@@ -251,7 +422,6 @@ def generate_script_example(prompt: str) -> str:
             temperature = 0.7,
             max_tokens  = 300          # 필요시 조정
         )
-        return res.choices[0].message.content.strip()
     except Exception as e:
         st.error(f"GPT 호출 실패: {e}")
         return "⚠️ GPT 호출 실패 – 나중에 다시 시도해 주세요."
@@ -262,12 +432,446 @@ def fill_example(prompt: str, key: str):
     st.session_state[key] = example
     st.toast("예시 대본이 입력되었습니다! 필요에 맞게 수정해 보세요.")
 
+# 차시별 패널 (st.fragment)
+# 패널 안의 위젯을 바꾸면 그 패널만 다시 실행되고, 시트 로드·기록 파싱·로그인 화면은 다시 실행되지 않음
+# 패널에 필요한 데이터는 인자로만 받음 (패널만 다시 실행될 때는 처음 받은 인자를 그대로 사용)
+
+@st.fragment
+def regression_panel(sid: str, df: pd.DataFrame, x: np.ndarray, y: np.ndarray, base: pd.Timestamp):
+    """2차시: 세 점 회귀 분석 + 적합도 평가 (같은 계수를 쓰므로 한 패널로 묶음)."""
+    # 세 점 탐색 전략 (기록이 많을 때는 빠른 탐색 사용)
+    strategy = st.selectbox(
+        "세 점 탐색 방법",
+        list(SEARCH_STRATEGIES.keys()),
+        format_func=SEARCH_STRATEGIES.get,
+        key="search_strategy"
+    )
+    budget = 20_000
+    if strategy == "sampled":
+        budget = st.number_input("표본 조합 수 N", min_value=100, max_value=1_000_000,
+                                 value=20_000, step=1000, key="search_budget")
+    compare = strategy != "exhaustive" and st.checkbox("가장 잘 맞는 세 점 곡선과 비교하기", key="search_compare")
+
+    # 그래프 보기 버튼
+    if st.button("회귀 분석하기"):
+        # 1) 최적 세 점 선택 (x, y는 원래 초 단위 x와 원단위 y, 후보 조합을 배열로 한 번에 평가)
+        if strategy == "exhaustive":
+            # 지난번 분석 이후 추가된 기록이 포함된 조합만 확인
+            fit = st.session_state.setdefault(f"inc_fit_{sid}", IncrementalFit())
+            added = fit.sync(x, y)
+            result = TripleSearch(strategy, fit.best[0] if fit.best else None,
+                                  fit.best[1] if fit.best else np.nan, added)
+        else:
+            result = search_triple(x, y, strategy, budget=int(budget), compare=compare)
+
+        # 순증가 조건을 만족하는 첫 세 점 (세 점 MSE는 모두 0이라 combinations() 순서로 고름, 없으면 처음 세 점)
+        idxs = result.idxs if result.idxs else list(range(min(3, len(df))))
+        if strategy == "exhaustive":
+            st.caption(f"새로 반영한 기록: {result.evaluated:,}개 (전체 {len(fit):,}개)")
+        else:
+            st.caption(f"탐색한 조합 수: {result.evaluated:,}개")
+        if compare and result.same_as_optimum is not None:
+            if result.same_as_optimum:
+                st.caption("✅ 전체 데이터 MSE가 가장 작은 세 점 곡선을 찾았습니다.")
+            else:
+                st.caption(f"전체 데이터 MSE가 가장 작은 세 점 곡선보다 MSE가 {result.gap_pct:+.1f}% 큽니다.")
+        sel = df.loc[list(idxs)].reset_index(drop=True)
+
+        # 2) y_scaled: 만 단위로 축소
+        y_scaled = sel['viewcount'] / 10000  # 예: 381000 → 38.1 (만 단위)
+
+        # 3) x_hours: 경과 시간(시 단위) 계산
+        elapsed_seconds = (sel['timestamp'] - base).dt.total_seconds()
+        x_hours = elapsed_seconds / 3600  # 예: 3600초 → 1.0 (시 단위)
+
+        # 4) 이차회귀계수 계산 (y_scaled에 대해)
+        a, b, c = np.polyfit(x_hours, y_scaled, 2)
+
+        elapsed_all = (df['timestamp'] - base).dt.total_seconds()
+        x_hours_all = elapsed_all / 3600
+
+        # 5) session_state에 회귀계수와 기본 변수들 저장
+        st.session_state.update({
+            'a': a,
+            'b': b,
+            'c': c,
+            'base': base,
+            'x_hours': x_hours,     # 회귀에 사용된 x(시간 단위)
+            'y': y,                 # 원본 조회수(원 단위)
+            'y_scaled': y_scaled,    # 선택된 세 점의 조회수(만 단위)
+            'x_hours_all': x_hours_all,
+            'model': QuadraticModel(a, b, c, base=base)   # 계수·예측·목표 시점 계산
+        })
+
+        # 선택된 세 점만 산점도로 표시 (브라우저에서 그림, 확대·툴팁 가능)
+        elapsed_sel = (sel['timestamp'] - base).dt.total_seconds() / 3600
+        st.altair_chart(selected_chart(elapsed_sel.values, y_scaled.values), use_container_width=True)
+
+        # 회귀식 출력 (만 단위 기준, 소수점 네 자리로)
+        str_a = f"{a:.4f}"
+        str_b = f"{b:.4f}"
+        str_c = f"{c:.4f}"
+        st.markdown(
+            f"**이차회귀식 (단위: 만 회 기준)**\n\n"
+            f"- $y$ : 실제 조회수 ÷ 10,000 (만 단위)\n"
+            f"- $x$ : 경과시간 (시간 단위, 기준=base)\n\n"
+            f"$$y(만) = {str_a}\\,x^2 \;+\; {str_b}\\,x \;+\; {str_c}$$\n\n"
+            f"예를 들어, 위 식에서 $y=100$ ($\\equiv$ 실제 조회수 1,000,000)이 되는 $x$를 구하면,\n"
+            f"그 값을 시간(시) 단위로 해석할 수 있습니다."
+        )
+
+        st.markdown(
+            "**Q1.** 이차함수의 식을 보고 축의 방정식, 볼록성, 꼭짓점, y절편을 찾아보세요.\n\n"
+            "**Q2.** 실제 조회수 1,000,000(만 단위로 100)이 되는 시점을 예측해보세요.\n"
+            "(Hint: 위 회귀식에서 $y=100$인 $x$를 구하면 됩니다. 단위는 시간(시)입니다.)"
+        )
+
+        # 직접 풀어본 뒤 확인할 수 있도록 접어서 제공
+        model = st.session_state['model']
+        with st.expander("✅ 계산 결과 확인하기 (직접 풀어본 뒤 열어보세요)"):
+            vx, vy = model.vertex
+            t_hit = model.time_to_target(1_000_000)
+            lines = [
+                f"- 볼록성: {'아래로 볼록 (a > 0)' if a > 0 else '위로 볼록 (a < 0)' if a < 0 else '직선 (a = 0)'}",
+                f"- 축의 방정식: $x = {model.axis:.4f}$",
+                f"- 꼭짓점: $({vx:.4f},\\; {vy:.4f})$",
+                f"- y절편: ${model.y_intercept:.4f}$",
+            ]
+            if np.isfinite(t_hit):
+                lines.append(f"- 조회수 1,000,000회 도달: 약 **{t_hit:,.1f}시간** 후 "
+                             f"({model.time_at(t_hit):%Y-%m-%d %H:%M})")
+            else:
+                lines.append("- 이 회귀식으로는 조회수 1,000,000회에 도달하지 않습니다.")
+            st.markdown("\n".join(lines))
+
+        # 적합도 평가 및 상세 보기 버튼 상태 초기화
+        st.session_state["eval_clicked"] = False
+        st.session_state["detail_clicked"] = False
+
+    # 회귀분석 그래프 PNG (다운로드를 요청할 때만 서버에서 그림)
+    if "x_hours" in st.session_state and "y_scaled" in st.session_state:
+        x_sel = np.asarray(st.session_state["x_hours"], dtype=float)
+        y_sel = np.asarray(st.session_state["y_scaled"], dtype=float)
+        png_download("📷 회귀분석 그래프 다운로드", "regression_plot.png", "selected",
+                     ("selected", data_hash(x_sel, y_sel)), draw_selected, x_sel, y_sel, figsize=(6, 6))
+
+    # ─── 2. 회귀 계수와 데이터 준비 (세션에 저장되어 있어야 함) ─────────────
+    if "a" in st.session_state and "df" in st.session_state and "base" in st.session_state:
+        a         = st.session_state["a"]
+        b         = st.session_state["b"]
+        c         = st.session_state["c"]
+        base      = st.session_state["base"]
+        df_global = st.session_state["df"]
+
+        # 시간축·조회수는 한 번만 계산해 평가와 상세 보기에서 함께 씀
+        # (df_global은 파싱 단계에서 결측·형식 오류 행이 이미 빠져 있음)
+        timestamps  = df_global['timestamp']
+        y_original  = df_global['viewcount'].astype(float).values
+        x_hours_all = (timestamps - base).dt.total_seconds().values / 3600
+
+        # 같은 계수면 평가기를 재사용하고, 기록이 추가되면 새 행만 반영
+        eval_key  = f"fit_eval_{sid}"
+        evaluator = st.session_state.get(eval_key)
+        if evaluator is None or evaluator.coefs != (a, b, c):
+            evaluator = FitEvaluator(a, b, c)
+            st.session_state[eval_key] = evaluator
+        evaluator.sync(x_hours_all, y_original)
+        report = evaluator.report()
+
+        # ─── 3. ‘적합도 평가’ 버튼 ───────────────────────────────────────
+        if st.button("적합도 평가", key="eval_button"):
+            st.session_state["eval_clicked"] = True
+
+        if st.session_state.get("eval_clicked", False):
+            # 1) 결과 출력
+            st.markdown(f"### 🔍 평균 절대 오차 (MAE): {report.mae:,.0f}회")
+            st.markdown(f"### 🔍 평균 오차율 (MAPE): {report.mape:.1f}%")
+
+            # 2) 등급 평가
+            st.markdown(f"**모델 적합 등급:** {report.grade}")
+
+            # 3) 시각화 (지표는 전체 데이터로 계산하고, 그래프에는 모양을 유지한 채 줄인 점만 보냄)
+            idx = downsample(report.x_hours, report.y)
+            df_plot = pd.DataFrame({
+                '시간(시간 단위)': report.x_hours[idx],
+                '실제 조회수':    report.y[idx],
+                '예측 조회수':    report.y_pred[idx]
+            })
+            st.line_chart(df_plot.set_index('시간(시간 단위)'))
+
+            # 4) 추가 지표: 세 점 회귀식 vs 모든 점 최소제곱 이차식
+            with st.expander("📐 더 자세한 지표 (RMSE·R²·최소제곱 비교)"):
+                rows = {"세 점 회귀식": {"MAE": report.mae, "MAPE(%)": report.mape,
+                                         "RMSE": report.rmse, "R²": report.r2}}
+                if report.lsq_metrics is not None:
+                    rows["모든 점 최소제곱"] = report.lsq_metrics
+                st.table(pd.DataFrame(rows).T.style.format(
+                    {"MAE": "{:,.0f}", "MAPE(%)": "{:.1f}", "RMSE": "{:,.0f}", "R²": "{:.3f}"}))
+                if report.lsq_coefs is not None:
+                    la, lb, lc = report.lsq_coefs
+                    st.caption(f"최소제곱 이차식: y = {la:.6f}x² + {lb:.6f}x + {lc:.6f} (만 단위)")
+                st.caption("RMSE는 큰 오차에 더 민감하고, R²는 1에 가까울수록 데이터의 변화를 잘 설명해요.")
+
+            # 5) 개념 설명
+            st.markdown("""
+    **MAE(평균 절대 오차)**  
+    예측값과 실제값의 차이를 모두 양수로 바꿔 평균을 구한 값으로,  
+    ‘평균적으로 몇 회’ 차이가 나는지를 직관적으로 알려줘요.
+
+    **MAPE(평균 오차율)**  
+    예측 오차가 실제 조회수 대비 몇 퍼센트인지 알려줘서,  
+    숫자가 커도 비율로 쉽게 비교할 수 있습니다.
+
+    - 값이 작을수록 모델이 더 정확해요!  
+    - 등급과 그래프를 통해 모델 성능을 한눈에 파악해 보세요.
+    """)
+        if st.button("실제 데이터 더 확인하기", key="detail_button"):
+            st.session_state["detail_clicked"] = True
+
+        if st.session_state.get("detail_clicked", False):
+            # 1) 실제 데이터 + 회귀 곡선 (브라우저에서 그림)
+            # 기록이 많으면 MAX_POINTS개로 줄여 보내므로, 구간을 좁히면 그 안에서 다시 골라 자세히 보여 줌
+            t_range = None
+            if len(y_original) > MAX_POINTS:
+                t0, t1 = pd.Timestamp(timestamps.min()), pd.Timestamp(timestamps.max())
+                t_range = st.slider("보기 구간", min_value=t0.to_pydatetime(), max_value=t1.to_pydatetime(),
+                                    value=(t0.to_pydatetime(), t1.to_pydatetime()),
+                                    format="MM/DD HH:mm", key="detail_range")
+            st.altair_chart(detail_chart(timestamps, y_original, base, a, b, c, x_hours_all.max(),
+                                         t_range),
+                            use_container_width=True)
+
+            # 2) 이미지 다운로드 (요청할 때만 PNG 생성, 같은 데이터·계수면 캐시 재사용)
+            png_download("📷 실제 데이터 그래프 다운로드", "real_data_plot.png", "detail",
+                         ("detail", data_hash(timestamps, y_original), a, b, c),
+                         draw_detail, timestamps, y_original, base, a, b, c, x_hours_all.max(),
+                         figsize=(6, 4))
+
+
+@st.fragment
+def opinion_panel():
+    """2차시: 반·조 선택과 의견 제출."""
+    st.subheader("💬 회귀분석과 적합도 평가 의견 남기기")
+    # ── 반 선택 ─────────────────────────────────────────
+    cls = st.selectbox(
+        "반을 선택하세요",              # 라벨
+        [f"{i}반" for i in range(1, 7)],  # 1~6반
+        key="class_select"
+    )
+
+    # ── 조 선택 ─────────────────────────────────────────
+    team = st.selectbox(
+        "조를 선택하세요",
+        [f"{c}조" for c in "ABCD"],        # A~D조
+        key="team_select"
+    )
+
+    st.write(f"선택 결과 → {cls} {team}")
+    session = f"{cls}-{team}"
+
+    opinion_input = st.text_area(
+        "모델 예측 결과(100만이 되는 시점)을 적고 실제 조회수의 차이에 대해 왜 차이가 발생했는지 그 이유를 적어주세요.",
+        height=120,
+        placeholder="예) 모델이 영상 업로드 초기의 급격한 조회수 증가를 과대평가한 것 같습니다/이차함수는 계속 올라가는데 영상 조회수의 증가는 한계가 있었습니다. 등등"
+    )
+
+    # 하나의 버튼으로 제출 → 요약 → 시트 저장
+    if st.button("의견 제출 및 요약 저장"):
+        if not opinion_input.strip():
+            st.warning("먼저 의견을 입력해 주세요.")
+        else:
+            # 1) GPT 요약
+            prompt = (
+                "다음 학생 의견을 간결하게 요약해 주세요:\n\n"
+                f"{opinion_input}"
+            )
+            messages = [
+                {"role": "system", "content": "당신은 수업 토의 내용을 간결히 요약하는 AI입니다."},
+                {"role": "user",   "content": prompt}
+            ]
+
+            # 2) 요약이 끝나면 스프레드시트에 기록 (백그라운드 작업)
+            eval_sheet_name = "적합도평가"  # 해당 시트 미리 생성
+            ws = open_worksheet(sheet_key(yt_id, eval_sheet_name))
+            timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+            submit_summary_job("job_opinion", messages, ws, [session, timestamp, opinion_input])
+    show_summary_job("job_opinion", "**요약:**")
+
+
+@st.fragment
+def ad_simulation_panel(model: QuadraticModel, timestamps: pd.Series, y_original: np.ndarray,
+                        x_now: float):
+    """3차시: 광고비·γ·p 슬라이더와 Power 모델 그래프."""
+    a, b, c = model.coefs
+    base = model.base                                # 기준 datetime
+
+    # 3) 광고비·γ·지수 p 입력
+    budget = st.number_input(
+        "투입할 광고비를 입력하세요 (원)",
+        min_value=0, step=10000, value=1000000, format="%d"
+    )
+    gamma = st.slider(
+        "광고효과 계수 γ 설정 (1만 원당 기본 증가 조회수)",
+        min_value=0.0, max_value=20.0, value=2.0, step=0.1
+    )
+    p = st.slider(
+        "광고비 효과 지수 p 설정 (1보다 크게 하면 드라마틱 효과)",
+        min_value=1.0, max_value=3.0, value=1.5, step=0.1
+    )
+
+    # 5) 시간 모델 예측값 (만 단위 → 원 단위)
+    y_time_scaled = model.predict(x_now)             # 만 단위 예측
+    y_time_now    = int(round(y_time_scaled * 10000))# 원 단위 예측
+
+    # 6) Power 모델 광고효과 계산
+    unit_won = 10000
+    units = budget // unit_won                       # 만 원 단위로 환산
+    y_ad = int(round(gamma * (units ** p)))          # γ × units^p (원 단위 추가 조회수)
+
+    # 7) 통합 예측 조회수
+    y_total_now = y_time_now + y_ad
+
+    # 8) 결과 출력
+    st.write(f"▶️ 시간 모델 예측 조회수 (광고 없음): **{y_time_now:,}회**")
+    st.write(f"▶️ 광고비 효과 조회수 (Power 모델): **+{y_ad:,}회**  (γ×{units}^p)")
+    st.write(f"▶️ **통합 예측 조회수:** **{y_total_now:,}회**")
+
+    # 광고 효과를 더한 곡선이 100만 회에 도달하는 시점 (닫힌 형태)
+    t_hit = model.time_to_target(1_000_000)
+    t_hit_ad = model.time_to_target(1_000_000, extra_views=y_ad)
+    if np.isfinite(t_hit_ad):
+        gain = f" (광고 없을 때보다 {t_hit - t_hit_ad:,.1f}시간 빠름)" if np.isfinite(t_hit) else ""
+        st.write(f"▶️ 광고 효과 포함 1,000,000회 도달 예상: **{t_hit_ad:,.1f}시간** 후{gain}")
+
+    # 9) 시각화 (슬라이더를 움직여도 서버는 데이터만 보내고 브라우저에서 그림)
+    st.altair_chart(power_chart(timestamps, y_original, base, a, b, c,
+                                x_now, y_ad, y_time_now, y_total_now),
+                    use_container_width=True)
+
+    # 10) 그래프 다운로드 (요청할 때만 PNG 생성, 같은 데이터·a/b/c·γ·p·광고비면 캐시 재사용)
+    png_download("📷 광고 효과 Power 모델 그래프 다운로드", "power_ad_effect_updated.png", "power",
+                 ("power", data_hash(timestamps, y_original), a, b, c, gamma, p, budget),
+                 draw_power, timestamps, y_original, base, a, b, c,
+                 x_now, y_ad, y_time_now, y_total_now, figsize=(8, 4))
+
+    # 11) 광고비 × γ × p 격자를 한 번에 계산해 비교 (슬라이더를 여러 번 움직이지 않아도 됨)
+    with st.expander("🧮 광고비·γ·p 한눈에 비교하기"):
+        target_hour = st.number_input(
+            "목표 시점 (경과 시간, 시간 단위)",
+            min_value=0.0, value=float(round(x_now, 1)), step=1.0, key="whatif_hour"
+        )
+        p_labels = [f"p={v:g}" for v in DEFAULT_PS]
+
+        need = budget_for_target(a, b, c, target_hour) / UNIT_WON
+        need_df = pd.DataFrame(np.where(np.isfinite(need), need, np.nan),
+                               index=[f"γ={g:g}" for g in DEFAULT_GAMMAS], columns=p_labels)
+        st.markdown(f"**{target_hour:g}시간까지 조회수 1,000,000회에 도달하는 데 필요한 광고비 (만 원)**")
+        st.altair_chart(heatmap_chart(need_df, "yelloworangered", na_label="도달 불가"),
+                        use_container_width=True)
+
+        views = whatif_grid(a, b, c, target_hour, gammas=[gamma])[:, 0, :]
+        views_df = pd.DataFrame(views, index=[f"{w // UNIT_WON:,}만 원" for w in DEFAULT_BUDGETS],
+                                columns=p_labels)
+        st.markdown(f"**γ={gamma:g}일 때 광고비·p별 {target_hour:g}시간 시점 예상 조회수 (회)**")
+        st.altair_chart(heatmap_chart(views_df, "blues"), use_container_width=True)
+
+
+@st.fragment
+def script_editor_panel():
+    """4차시: 역할별 발표 대본 작성·요약."""
+    # ── 반 선택 ─────────────────────────────────────────
+    cls = st.selectbox(
+        "반을 선택하세요",              # 라벨
+        [f"{i}반" for i in range(1, 7)],  # 1~6반
+        key="class_select"
+    )
+
+    # ── 조 선택 ─────────────────────────────────────────
+    team = st.selectbox(
+        "조를 선택하세요",
+        [f"{c}조" for c in "ABCD"],        # A~D조
+        key="team_select"
+    )
+
+    st.write(f"선택 결과 → {cls} {team}")
+    session = f"{cls}-{team}"
+
+    st.divider()  # 시각적 구분선
+
+        # ── 역할 선택 & 안내 ───────────────────────────
+    roles = {
+        "영상 선정 기준": (
+            "분석에 적합한 영상 주제와 구독자 규모를 명확히 제시합니다. "
+            "주제 특성과 구독자 수치를 근거로 선정 이유를 설명합니다."),
+        "회귀분석 결과 및 그래프 설명": (
+            "이차함수 회귀식(a, b, c)의 의미를 풀이하고, "
+            "그래프의 꼭짓점·볼록성·y절편·100만 조회 시점을 강조합니다."),
+        "적합도 평가": (
+            "실제 조회수와 예측값의 평균 오차를 제시합니다. "
+            "오차 수치가 낮을수록 모델 정확도가 높다는 점을 명확히 합니다."),
+        "마케팅 전략": (
+            "분석 결과를 바탕으로 광고비 배분과 최적 업로드 타이밍을 제안합니다. "
+            "구체적 실행 방안을 포함해 설득력을 높입니다."),
+        "느낀점 및 종합 정리": (
+            "분석 과정에서 얻은 인사이트와 한계, 개선 방향을 정리합니다. "
+            "개인·조별 성장 경험을 담아 발표를 마무리합니다.")}
+    my_role = st.selectbox("역할을 선택하세요", list(roles.keys()), key="role_select")
+    st.info(f"**내 역할 가이드:**  {roles[my_role]}")
+
+    script_templates = {
+        "영상 선정 기준": "예시) 안녕하세요, 저는 저희 조에서 영상 선택 기준을 발표할 ○○○입니다. 저희 조는 영상의 주제, 재미, 그리고 채널의 구독자 수를 기준으로 영상을 골랐습니다. 특히 주제가 인기가 있고 사람들이 관심을 많이 가질 것 같은 영상을 선택했고, 재미있어서 끝까지 볼 만한 영상을 중점으로 살폈습니다. 또 구독자 수가 많은 채널은 조회수가 더 빨리 오를 거라고 생각해 선택했습니다. 감사합니다.",
+        "회귀분석 결과 및 그래프 설명": "예시) 안녕하세요, 저는 저희 조에서 회귀식을 설명하고, 100만 조회수를 달성하는 시점을 예측할 ○○○입니다. 저희가 구한 회귀식은 다음과 같습니다. y = □x² + □x + □ 이 식을 이용해 계산해본 결과, 약 □□일 후에 조회수가 100만 회에 도달할 것으로 예측했습니다. 실제 데이터와 비교했을 때, 저희 예측이 얼마나 정확한지 확인할 수 있었습니다. 감사합니다. 또한 저희 회귀식 그래프는 아래로 볼록한 이차함수 형태이며, 다음과 같은 특징을 가집니다. 꼭짓점은 (□□, □□)이고 그래프의 대칭축은 x=□□, y절편은 □□입니다.",
+        "적합도 평가": "예시) 안녕하세요, 저는 저희 조의 적합도 평가를 맡은 ○○○입니다. 저희는 예측 모델이 실제 조회수 데이터를 얼마나 잘 설명하는지를 확인하기 위해 평균 오차를 사용했습니다. 저희 결과는 약 **□□□**였습니다. 이 수치는 예측이 실제 데이터와 비교적 가까운 편이라는 것을 보여줍니다. 하지만 일부 시점에서는 예측값과 실제값의 차이가 크게 나는 구간도 있었는데, 그 이유는 영상이 갑자기 바이럴되었거나, 광고 효과가 컸던 시점 때문이라고 생각합니다. 이런 적합도 평가를 통해 단순히 회귀식을 세우는 것뿐 아니라, 그 식이 얼마나 믿을 만한지도 함께 판단할 수 있어서 좋았습니다. 감사합니다.",
+        "마케팅 전략": "예시) 안녕하세요, 저는 저희 조의 마케팅 전략 정리를 맡은 ○○○입니다. 저희 조는 분석한 결과를 바탕으로 다음과 같은 전략을 세웠습니다. 광고를 이용해 영상이 초반에 빨리 퍼질 수 있도록 합니다. 제목과 썸네일을 자극적으로 만들어 클릭률을 높입니다. 영상 길이를 짧게 만들어 사람들이 끝까지 볼 수 있게 합니다. 댓글을 자주 달고 시청자들과 소통하여 지속적인 관심을 유도합니다. 이러한 전략을 통해 저희 예측값과 실제 조회수의 차이를 줄일 수 있을 거라 생각합니다. 감사합니다.",
+        "느낀점 및 종합 정리": "예시) 안녕하세요, 저는 저희 조의 프로젝트 수업 소감을 맡은 ○○○입니다. 저는 이번 프로젝트를 통해 실제로 유튜브 영상의 조회수를 수학으로 예측할 수 있다는 점이 흥미로웠습니다. 처음에는 수학이 현실에서 별로 쓰이지 않을 줄 알았는데, 이번 활동을 하면서 수학이 생각보다 실생활과 많이 연결되어 있다는 것을 알게 됐습니다. 특히, 실제 데이터로 분석하고 예측했던 경험이 아주 재미있고 유익했습니다. 감사합니다."
+    }
+
+
+    # ── 대본 작성 영역 ─────────────────────────────
+    script_key = f"script_{session}_{my_role}"
+    script = st.text_area("대본을 작성해 보세요 ✍️",value=script_templates.get(my_role, ""), key=script_key, height=250,
+                        placeholder="여기에 발표 대본을 적어 보세요…")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        # ② 버튼 – on_click으로 콜백 연결
+        prompt = (
+            f"역할: {my_role}\n"
+            "발표 주제: 유튜브 이차회귀 분석 결과\n"
+            "200자 내외 발표 대본 작성"
+        )
+        st.button(
+            "💡 스크립트 예시 생성(GPT)",
+            on_click=fill_example,
+            args=(prompt, script_key)
+        )
+
+    with col2:
+        if st.button("📑 저장 & 요약", key="save_summary"):
+            if not script.strip():
+                st.error("대본이나 토의 내용을 입력해야 저장할 수 있습니다.")
+                return
+
+            # ① GPT 요약 → ② 시트 저장 (백그라운드 작업)
+            timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+            try:
+                ws = open_worksheet(sheet_key(yt_id, "토의요약"))   # 미리 생성
+                submit_summary_job("job_script", summary_messages(script), ws,
+                                   [session, my_role, timestamp, script],
+                                   temperature=0.3, max_tokens=300)
+            except Exception as e:
+                st.error(f"스프레드시트 저장 중 오류: {e}")
+
+        # ③ 요약 출력
+        show_summary_job("job_script", "### ✂️ GPT 요약본")
+
+
 # 학생 메인 화면(로그인 후) 
 def main_ui():
-    load_sheet_records.clear()
     user = st.session_state["user"]
     sid = str(user["학번"]) 
     st.sidebar.success(f"👋 {user['이름']}님, 반갑습니다!")
+    show_write_failures(st.sidebar)
     st.write("로그인에 성공했습니다! 이곳에서 유튜브 분석 기능을 사용하세요.")
     col1,col2=st.sidebar.columns(2)
     if col1.button('◀ 이전 단계') and st.session_state['step']>1:
@@ -280,25 +884,15 @@ def main_ui():
     st.info(f"현재  {step}번째 활동 중")
 
 
-    yt_rows = load_sheet_records(yt_id, yt_name)
-    records = [r for r in yt_rows if str(r.get('학번','')) == sid]
-    yt_ws = gc.open_by_key(yt_id).worksheet(yt_name)
-    usr_rows = load_sheet_records(usr_id, usr_name)
+    df = student_views(sid)
+    records = df is not None and not df.empty
+    bad_rows = get_view_partitions().quarantined(sid)
+    if bad_rows is not None:
+        with st.expander(f"⚠️ 읽을 수 없는 기록 {len(bad_rows)}건은 분석에서 제외했습니다"):
+            st.dataframe(bad_rows, hide_index=True)
+    yt_ws = open_worksheet(sheet_key(yt_id, yt_name))
 
     if records:
-        df = pd.DataFrame(records)
-        df.columns = df.columns.str.strip().str.lower()
-        df['timestamp'] = (
-            df['timestamp']
-            .astype(str)
-            .str.replace(r'\s*-\s*','-',regex=True)
-            .str.replace(r'\s+',' ',regex=True)
-            .str.strip()
-        )
-        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='raise')
-        df['viewcount'] = df['viewcount'].astype(int)
-        df = df.sort_values('timestamp').reset_index(drop=True)
-
         st.session_state["df"] = df
         base = df['timestamp'].min()
         x = (df['timestamp'] - base).dt.total_seconds().values
@@ -316,12 +910,18 @@ def main_ui():
             if not vid:
                 st.error("⛔ 유효한 유튜브 링크가 아닙니다.")
                 st.stop()
-            info = fetch_video_details(vid)
+            try:
+                info = fetch_video_details(vid)
+            except QuotaExceeded as e:
+                st.error(f"⛔ {e} 내일 다시 시도하세요.")
+                st.stop()
+            except requests.RequestException:
+                st.error("영상 정보를 가져올 수 없습니다. 잠시 후 다시 시도하세요.")
+                st.stop()
             if not info:
                 st.error("영상 정보를 가져올 수 없습니다.")
                 st.stop()
-            valid = (info['views']<VIDEO_CRITERIA['max_views'] and
-                      VIDEO_CRITERIA['min_subs']<=info['subs']<=VIDEO_CRITERIA['max_subs'])
+            valid = not check_video_criteria(info)
             st.write(info)
             if not valid:
                 st.warning("조건을 만족하지 않습니다. 다른 영상을 선택하세요.")
@@ -330,28 +930,55 @@ def main_ui():
             stats = {k:info[k] for k in ('views',)}  # views만 사용
             ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             safe_append(yt_ws, [sid, vid, ts, stats['views']])
+            if collector:
+                collector.register(sid, vid)   # 이후 조회수는 자동 수집
             st.success("✅ 기록 완료")
 
+        # 후보 영상 여러 개를 한 번에 검증
+        with st.expander("🔎 후보 영상 여러 개 한 번에 검증하기"):
+            urls_raw = st.text_area("유튜브 링크를 한 줄에 하나씩 입력하세요", key="yt_urls", height=150)
+            if st.button("후보 영상 일괄 검증", key="screen_btn"):
+                urls = [u.strip() for u in urls_raw.splitlines() if u.strip()]
+                vids = [extract_video_id(u) for u in urls]
+                try:
+                    infos = fetch_video_details_many(tuple(v for v in vids if v))
+                except QuotaExceeded as e:
+                    st.error(f"⛔ {e} 내일 다시 시도하세요.")
+                    st.stop()
+                except requests.RequestException:
+                    st.error("영상 정보를 가져올 수 없습니다. 잠시 후 다시 시도하세요.")
+                    st.stop()
+                table = []
+                for url, vid in zip(urls, vids):
+                    info = infos.get(vid) if vid else None
+                    if not info:
+                        reasons = ["유효한 링크가 아님" if not vid else "영상 정보 없음"]
+                        info = {}
+                    else:
+                        reasons = check_video_criteria(info)
+                    table.append({
+                        "링크": url,
+                        "video_id": vid or "",
+                        "제목": info.get("title", ""),
+                        "조회수": info.get("views"),
+                        "구독자": info.get("subs"),
+                        "결과": "✅ 통과" if not reasons else "❌ " + ", ".join(reasons),
+                    })
+                if table:
+                    st.dataframe(pd.DataFrame(table), hide_index=True)
+
         raw = st.text_area("나의 영상 선택 기준을 입력하세요", placeholder="예) 구독자 수 5천명 이상, 최근 6개월 이내 업로드, 조회수 증가 곡선이 완만한 영상",  key="selection_raw", height=200)
         if st.button("요약 & 저장", key="summary_btn"):
             if not raw.strip():
                 st.error("선정 기준을 입력해야 합니다.")
                 st.stop()
 
-            # GPT 요약
-            with st.spinner("GPT에게 기준을 요약받는 중..."):
-                summary = summarize_discussion(raw)
-            st.success("요약 완료!")
-            st.write("**요약본**")
-            st.write(summary)
-
-            # 스프레드시트 기록
-            ss = gc.open_by_key(yt_id)
-            ws = ss.worksheet("영상선택기준")  # 미리 해당 시트 생성
+            # GPT 요약 → 스프레드시트 기록 (백그라운드 작업)
+            ws = open_worksheet(sheet_key(yt_id, "영상선택기준"))  # 미리 해당 시트 생성
             timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-            row = [sid, timestamp, raw, summary]
-            safe_append(ws, row)
-            st.info("스프레드시트에 저장되었습니다.")
+            submit_summary_job("job_selection", summary_messages(raw), ws, [sid, timestamp, raw],
+                               temperature=0.3, max_tokens=300)
+        show_summary_job("job_selection")
     #2차시
     elif step==2:
         step_header("2️⃣-1️⃣ 유튜브 조회수 이차 회귀 분석하기",
@@ -361,276 +988,8 @@ def main_ui():
             st.info("내 기록이 아직 없습니다. 먼저 '1️⃣ 조회수 기록하기'로 기록하세요.")
             return
     
-        # 그래프 보기 버튼
-        if st.button("회귀 분석하기"):
-            # 1) 최적 세 점 선택
-            candidates = []
-            for i, j, k in combinations(range(len(df)), 3):
-                xi, yi = x[[i, j, k]], y[[i, j, k]]  # 여기서 x, y는 원래 초 단위 x와 원단위 y
-                a_tmp, b_tmp, c_tmp = np.polyfit(xi, yi, 2)
-                # 순증가 구간(오름차순) 조건 체크
-                if a_tmp <= 0 or (2 * a_tmp * xi[0] + b_tmp) <= 0 or (2 * a_tmp * xi[2] + b_tmp) <= 0:
-                    continue
-                mse = np.mean((yi - (a_tmp * xi**2 + b_tmp * xi + c_tmp))**2)
-                candidates.append((mse, (i, j, k)))
-
-            # 후보 중 MSE가 가장 작은 세 점 선택 (없으면 그냥 처음 세 점)
-            idxs = min(candidates, key=lambda v: v[0])[1] if candidates else list(range(min(3, len(df))))
-            sel = df.loc[list(idxs)].reset_index(drop=True)
-
-            # 2) y_scaled: 만 단위로 축소
-            y_scaled = sel['viewcount'] / 10000  # 예: 381000 → 38.1 (만 단위)
-
-            # 3) x_hours: 경과 시간(시 단위) 계산
-            elapsed_seconds = (sel['timestamp'] - base).dt.total_seconds()
-            x_hours = elapsed_seconds / 3600  # 예: 3600초 → 1.0 (시 단위)
-
-            # 4) 이차회귀계수 계산 (y_scaled에 대해)
-            a, b, c = np.polyfit(x_hours, y_scaled, 2)
-
-            elapsed_all = (df['timestamp'] - base).dt.total_seconds()
-            x_hours_all = elapsed_all / 3600
-
-            # 5) session_state에 회귀계수와 기본 변수들 저장
-            st.session_state.update({
-                'a': a,
-                'b': b,
-                'c': c,
-                'base': base,
-                'x_hours': x_hours,     # 회귀에 사용된 x(시간 단위)
-                'y': y,                 # 원본 조회수(원 단위)
-                'y_scaled': y_scaled,    # 선택된 세 점의 조회수(만 단위)
-                'x_hours_all': x_hours_all
-            })
-
-            # 선택된 세 점만 산점도로 표시
-            elapsed_sel = (sel['timestamp'] - base).dt.total_seconds() / 3600
-            fig, ax = plt.subplots(figsize=(6, 6))
-            ax.scatter(
-                elapsed_sel,
-                y_scaled,
-                s=100,
-                color='steelblue',
-                label="선택된 세 점 (만 단위)"
-            )
-            ax.grid(True, linestyle='--', alpha=0.7)
-            ax.set_xlabel('경과 시간 (시간 단위)')
-            ax.set_ylabel('조회수 (단위: 만 회)')
-            ax.legend()
-            st.pyplot(fig)
-
-            # 그래프 저장 및 다운로드 버튼
-            buf = io.BytesIO()
-            fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-            buf.seek(0)
-            st.download_button(
-                label="📷 회귀분석 그래프 다운로드",
-                data=buf,
-                file_name="regression_plot.png",
-                mime="image/png"
-            )
-
-            # 회귀식 출력 (만 단위 기준, 소수점 네 자리로)
-            str_a = f"{a:.4f}"
-            str_b = f"{b:.4f}"
-            str_c = f"{c:.4f}"
-            st.markdown(
-                f"**이차회귀식 (단위: 만 회 기준)**\n\n"
-                f"- $y$ : 실제 조회수 ÷ 10,000 (만 단위)\n"
-                f"- $x$ : 경과시간 (시간 단위, 기준=base)\n\n"
-                f"$$y(만) = {str_a}\\,x^2 \;+\; {str_b}\\,x \;+\; {str_c}$$\n\n"
-                f"예를 들어, 위 식에서 $y=100$ ($\\equiv$ 실제 조회수 1,000,000)이 되는 $x$를 구하면,\n"
-                f"그 값을 시간(시) 단위로 해석할 수 있습니다."
-            )
-
-            st.markdown(
-                "**Q1.** 이차함수의 식을 보고 축의 방정식, 볼록성, 꼭짓점, y절편을 찾아보세요.\n\n"
-                "**Q2.** 실제 조회수 1,000,000(만 단위로 100)이 되는 시점을 예측해보세요.\n"
-                "(Hint: 위 회귀식에서 $y=100$인 $x$를 구하면 됩니다. 단위는 시간(시)입니다.)"
-            )
-
-            # 적합도 평가 및 상세 보기 버튼 상태 초기화
-            st.session_state["eval_clicked"] = False
-            st.session_state["detail_clicked"] = False
-
-        # ─── 2. 회귀 계수와 데이터 준비 (세션에 저장되어 있어야 함) ─────────────
-        if "a" in st.session_state and "df" in st.session_state and "base" in st.session_state:
-            a         = st.session_state["a"]
-            b         = st.session_state["b"]
-            c         = st.session_state["c"]
-            base      = st.session_state["base"]
-            df_global = st.session_state["df"]
-
-            # y_original: 세션에 있으면 그대로, 없으면 df_global에서 추출
-            y_original = np.array(df_global['viewcount'])
-
-            # x_hours_all: 세션에 있으면 그대로, 없으면 계산
-            if "x_hours_all" in st.session_state:
-                x_hours_all = st.session_state["x_hours_all"]
-            else:
-                elapsed_all = (df_global['timestamp'] - base).dt.total_seconds()
-                x_hours_all = elapsed_all / 3600
-
-            # ─── 3. ‘적합도 평가’ 버튼 ───────────────────────────────────────
-            if st.button("적합도 평가", key="eval_button"):
-                st.session_state["eval_clicked"] = True
-
-            if st.session_state.get("eval_clicked", False):
-                # 1) 결측치 있는 행 제거
-                df_clean = df_global.dropna(subset=['timestamp', 'viewcount']).reset_index(drop=True)
-
-                # 2) timestamp→datetime, viewcount→numpy array
-                timestamps  = pd.to_datetime(df_clean['timestamp'])
-                y_original  = df_clean['viewcount'].astype(float).values
-
-                # 3) 시간 경과(초) → 시간(시간 단위)
-                elapsed_sec = (timestamps - base).dt.total_seconds()
-                x_hours_all = elapsed_sec / 3600
-
-                # 디버깅: 길이 확인 (주석 해제해 보세요)
-                # st.write("len(x)=", x_hours_all.size, "len(y)=", y_original.size)
-
-                # 4) 예측값 계산 (만 단위 → 원 단위)
-                time_poly     = np.poly1d([a, b, c])
-                y_pred_scaled = time_poly(x_hours_all)
-                y_pred        = y_pred_scaled * 10000
-
-                # 5) MAE/​MAPE 계산
-                errors     = y_original - y_pred
-                abs_errors = np.abs(errors)
-                MAE        = np.mean(abs_errors)
-                MAPE       = np.mean(abs_errors / (y_original + 1)) * 100
-
-                # 6) 결과 출력
-                st.markdown(f"### 🔍 평균 절대 오차 (MAE): {MAE:,.0f}회")
-                st.markdown(f"### 🔍 평균 오차율 (MAPE): {MAPE:.1f}%")
-
-                # 7) 등급 평가
-                if MAPE <= 15:
-                    grade = "🟢 매우 정확!"
-                elif MAPE <= 40:
-                    grade = "🟡 보통 수준"
-                else:
-                    grade = "🔴 개선 필요"
-                st.markdown(f"**모델 적합 등급:** {grade}")
-
-                # 8) 시각화
-                df_plot = pd.DataFrame({
-                    '시간(시간 단위)': x_hours_all,
-                    '실제 조회수':    y_original,
-                    '예측 조회수':    y_pred
-                })
-                st.line_chart(df_plot.set_index('시간(시간 단위)'))
-
-                # 4-7) 개념 설명
-                st.markdown("""
-        **MAE(평균 절대 오차)**  
-        예측값과 실제값의 차이를 모두 양수로 바꿔 평균을 구한 값으로,  
-        ‘평균적으로 몇 회’ 차이가 나는지를 직관적으로 알려줘요.
-
-        **MAPE(평균 오차율)**  
-        예측 오차가 실제 조회수 대비 몇 퍼센트인지 알려줘서,  
-        숫자가 커도 비율로 쉽게 비교할 수 있습니다.
-
-        - 값이 작을수록 모델이 더 정확해요!  
-        - 등급과 그래프를 통해 모델 성능을 한눈에 파악해 보세요.
-        """)
-            if st.button("실제 데이터 더 확인하기", key="detail_button"):
-                st.session_state["detail_clicked"] = True
-
-            if st.session_state.get("detail_clicked", False):
-                # 1) 결측치 제거 후 재계산
-                df_clean = df_global.dropna(subset=['timestamp', 'viewcount']).reset_index(drop=True)
-                timestamps = pd.to_datetime(df_clean['timestamp'])
-                y_original = df_clean['viewcount'].astype(float).values
-
-                # 2) 시간(시간 단위) 축 재계산
-                elapsed_sec = (timestamps - base).dt.total_seconds()
-                x_hours_all = elapsed_sec / 3600
-
-                # 3) 회귀 곡선용 시간 샘플
-                ts_curve = np.linspace(0, x_hours_all.max(), 200)
-
-                # 4) 플롯 그리기
-                fig2, ax2 = plt.subplots(figsize=(6, 4))
-                ax2.scatter(timestamps, y_original, alpha=0.5, label="실제 조회수")
-
-                # 5) 모델 곡선 계산 & 플롯
-                y_curve_scaled = a * ts_curve**2 + b * ts_curve + c
-                y_curve = y_curve_scaled * 10000
-                x_curve_timestamps = base + pd.to_timedelta(ts_curve * 3600, unit='s')
-                ax2.plot(x_curve_timestamps, y_curve, color='red', linewidth=2, label="회귀 곡선")
-
-                ax2.set_xlabel('시간')
-                ax2.set_ylabel('조회수')
-                ax2.legend()
-                plt.xticks(rotation=45)
-                st.pyplot(fig2)
-
-                # 6) 이미지 다운로드 버튼
-                buf1 = io.BytesIO()
-                fig2.savefig(buf1, format='png', dpi=150, bbox_inches='tight')
-                buf1.seek(0)
-                st.download_button(
-                    label="📷 실제 데이터 그래프 다운로드",
-                    data=buf1,
-                    file_name="real_data_plot.png",
-                    mime="image/png"
-                )
-            
-                    # 학생 의견 입력란
-        st.subheader("💬 회귀분석과 적합도 평가 의견 남기기")
-                # ── 반 선택 ─────────────────────────────────────────
-        cls = st.selectbox(
-            "반을 선택하세요",              # 라벨
-            [f"{i}반" for i in range(1, 7)],  # 1~6반
-            key="class_select"
-        )
-
-        # ── 조 선택 ─────────────────────────────────────────
-        team = st.selectbox(
-            "조를 선택하세요",
-            [f"{c}조" for c in "ABCD"],        # A~D조
-            key="team_select"
-        )
-
-        st.write(f"선택 결과 → {cls} {team}")
-        session = f"{cls}-{team}"
-
-        opinion_input = st.text_area(
-            "모델 예측 결과(100만이 되는 시점)을 적고 실제 조회수의 차이에 대해 왜 차이가 발생했는지 그 이유를 적어주세요.",
-            height=120,
-            placeholder="예) 모델이 영상 업로드 초기의 급격한 조회수 증가를 과대평가한 것 같습니다/이차함수는 계속 올라가는데 영상 조회수의 증가는 한계가 있었습니다. 등등"
-        )
-
-        # 하나의 버튼으로 제출 → 요약 → 시트 저장
-        if st.button("의견 제출 및 요약 저장"):
-            if not opinion_input.strip():
-                st.warning("먼저 의견을 입력해 주세요.")
-            else:
-                # 1) GPT 요약
-                prompt = (
-                    "다음 학생 의견을 간결하게 요약해 주세요:\n\n"
-                    f"{opinion_input}"
-                )
-                resp = openai.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "당신은 수업 토의 내용을 간결히 요약하는 AI입니다."},
-                        {"role": "user",   "content": prompt}
-                    ]
-                )
-                summary = resp.choices[0].message.content
-                st.markdown("**요약:**  " + summary)
-
-                # 스프레드시트에 기록
-                eval_sheet_name = "적합도평가"  # 해당 시트 미리 생성
-                ws = gc.open_by_key(yt_id).worksheet(eval_sheet_name)
-                timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-                row = [session, timestamp, opinion_input, summary]
-                safe_append(ws, row)
-
-                st.success("의견과 요약이 시트에 저장되었습니다!")
+        regression_panel(sid, df, x, y, base)
+        opinion_panel()
 
     elif step == 3 and all(k in st.session_state for k in ('a','b','c')):
         # 1) 제목 및 질문
@@ -642,86 +1001,12 @@ def main_ui():
             "광고는 조회수에 어떤 영향을 미칠 수 있을까? 그 영향이 그래프에서 어떻게 나타날까?"]
         )
 
-        # 2) 시간 모델 계수 불러오기
-        a, b, c = st.session_state['a'], st.session_state['b'], st.session_state['c']
-        time_poly = np.poly1d([a, b, c])
-
-        # 3) 광고비·γ·지수 p 입력
-        budget = st.number_input(
-            "투입할 광고비를 입력하세요 (원)",
-            min_value=0, step=10000, value=1000000, format="%d"
-        )
-        gamma = st.slider(
-            "광고효과 계수 γ 설정 (1만 원당 기본 증가 조회수)",
-            min_value=0.0, max_value=20.0, value=2.0, step=0.1
-        )
-        p = st.slider(
-            "광고비 효과 지수 p 설정 (1보다 크게 하면 드라마틱 효과)",
-            min_value=1.0, max_value=3.0, value=1.5, step=0.1
-        )
-
-        # 4) 현재 시점(시간 단위) 계산
-        x_hours = st.session_state["x_hours"]            # (timestamp - base).dt.total_seconds()/3600
-        x_now = x_hours.iloc[-1]                         # 마지막 기록 시점 (시간 단위)
-        base = st.session_state["base"]                  # 기준 datetime
-        t_now = base + pd.to_timedelta(x_now * 3600, 's')
-
-        # 5) 시간 모델 예측값 (만 단위 → 원 단위)
-        y_time_scaled = time_poly(x_now)                 # 만 단위 예측
-        y_time_now    = int(round(y_time_scaled * 10000))# 원 단위 예측
-
-        # 6) Power 모델 광고효과 계산
-        unit_won = 10000
-        units = budget // unit_won                       # 만 원 단위로 환산
-        y_ad = int(round(gamma * (units ** p)))          # γ × units^p (원 단위 추가 조회수)
-
-        # 7) 통합 예측 조회수
-        y_total_now = y_time_now + y_ad
-
-        # 8) 결과 출력
-        st.write(f"▶️ 시간 모델 예측 조회수 (광고 없음): **{y_time_now:,}회**")
-        st.write(f"▶️ 광고비 효과 조회수 (Power 모델): **+{y_ad:,}회**  (γ×{units}^p)")
-        st.write(f"▶️ **통합 예측 조회수:** **{y_total_now:,}회**")
+        # 2) 시간 모델과 현재 시점 (슬라이더 패널에는 이 값들만 넘김)
+        model = st.session_state.get('model') or QuadraticModel(
+            st.session_state['a'], st.session_state['b'], st.session_state['c'], base=st.session_state['base'])
+        ad_simulation_panel(model, st.session_state["df"]['timestamp'], st.session_state["y"],
+                            float(st.session_state["x_hours"].iloc[-1]))
 
-        # 9) 시각화
-        fig2, ax2 = plt.subplots(figsize=(8, 4))
-        df_global = st.session_state["df"]
-        y_original = st.session_state["y"]
-
-        # 실제 데이터
-        ax2.scatter(df_global['timestamp'], y_original, alpha=0.5, label="실제 조회수")
-
-        # 시간 모델 곡선 (광고 없음)
-        ts_curve = np.linspace(0, x_now, 200)
-        y_curve = time_poly(ts_curve) * 10000
-        times = base + pd.to_timedelta(ts_curve * 3600, 's')
-        ax2.plot(times, y_curve, linestyle="--", color="orange", lw=2, label="시간 모델 (광고 없음)")
-
-        # 광고효과를 더한 Power 모델 곡선
-        y_curve_with_ad = y_curve + y_ad
-        ax2.plot(times, y_curve_with_ad, color="red", lw=2, label="시간 모델 + 광고 효과")
-
-        # 현재 시점 예측점
-        ax2.scatter(t_now, y_time_now, color="green", s=80, label="광고 전 예측")
-        ax2.scatter(t_now, y_total_now, color="red",   s=100, label="광고 후 예측")
-
-        ax2.set_xlabel("시간")
-        ax2.set_ylabel("조회수 (원 단위)")
-        ax2.legend()
-        plt.xticks(rotation=45)
-        st.pyplot(fig2)
-
-        # 10) 그래프 다운로드
-        buf2 = io.BytesIO()
-        fig2.savefig(buf2, format='png', dpi=150, bbox_inches='tight')
-        buf2.seek(0)
-        st.download_button(
-            label="📷 광고 효과 Power 모델 그래프 다운로드",
-            data=buf2,
-            file_name="power_ad_effect_updated.png",
-            mime="image/png"
-        )
-        
         with st.expander("📖 γ(감마)·p(지수) 계수 해설 (학생용)"):
             st.markdown("""
             **1. γ(감마) 계수란?**  
@@ -760,106 +1045,139 @@ def main_ui():
         step_header("3️⃣ 토의 내용 입력 & 요약하기",
                 ["데이터 분석 결과를 종합하여 발표 자료로 구성하고 분석 및 마케팅 전략에 대해 명확하게 전달할 수 있다.","조별 협력을 통해 체계적으로 발표 준비 과정을 경험하고 설득력 있는 발표를 구성할 수 있다."],
                 ["우리 조가 분석한 결과를 가장 효과적으로 전달하려면 어떻게 발표를 구성해야 할까?", "우리가 선택한 영상의 특성을 명확히 설명하기 위한 핵심적인 내용은 무엇일까?", "이차함수 회귀식과 그래프에서 꼭 강조해야 하는 성질과 의미는 무엇일까?","예측값과 실제값의 차이를 발표에서 어떻게 설명하면 설득력이 있을까?","우리의 마케팅 전략을 설득력 있게 전달하려면 어떤 자료와 표현을 써야 할까?","이 분석 활동을 통해 어떤 것을 새롭게 배우고 느꼈는지 발표에서 어떻게 말하면 좋을까?"])
-                # ── 반 선택 ─────────────────────────────────────────
-        cls = st.selectbox(
-            "반을 선택하세요",              # 라벨
-            [f"{i}반" for i in range(1, 7)],  # 1~6반
-            key="class_select"
-        )
+        script_editor_panel()
 
-        # ── 조 선택 ─────────────────────────────────────────
-        team = st.selectbox(
-            "조를 선택하세요",
-            [f"{c}조" for c in "ABCD"],        # A~D조
-            key="team_select"
-        )
-
-        st.write(f"선택 결과 → {cls} {team}")
-        session = f"{cls}-{team}"
-
-        st.divider()  # 시각적 구분선
-
-            # ── 역할 선택 & 안내 ───────────────────────────
-        roles = {
-            "영상 선정 기준": (
-                "분석에 적합한 영상 주제와 구독자 규모를 명확히 제시합니다. "
-                "주제 특성과 구독자 수치를 근거로 선정 이유를 설명합니다."),
-            "회귀분석 결과 및 그래프 설명": (
-                "이차함수 회귀식(a, b, c)의 의미를 풀이하고, "
-                "그래프의 꼭짓점·볼록성·y절편·100만 조회 시점을 강조합니다."),
-            "적합도 평가": (
-                "실제 조회수와 예측값의 평균 오차를 제시합니다. "
-                "오차 수치가 낮을수록 모델 정확도가 높다는 점을 명확히 합니다."),
-            "마케팅 전략": (
-                "분석 결과를 바탕으로 광고비 배분과 최적 업로드 타이밍을 제안합니다. "
-                "구체적 실행 방안을 포함해 설득력을 높입니다."),
-            "느낀점 및 종합 정리": (
-                "분석 과정에서 얻은 인사이트와 한계, 개선 방향을 정리합니다. "
-                "개인·조별 성장 경험을 담아 발표를 마무리합니다.")}
-        my_role = st.selectbox("역할을 선택하세요", list(roles.keys()), key="role_select")
-        st.info(f"**내 역할 가이드:**  {roles[my_role]}")
-
-        script_templates = {
-            "영상 선정 기준": "예시) 안녕하세요, 저는 저희 조에서 영상 선택 기준을 발표할 ○○○입니다. 저희 조는 영상의 주제, 재미, 그리고 채널의 구독자 수를 기준으로 영상을 골랐습니다. 특히 주제가 인기가 있고 사람들이 관심을 많이 가질 것 같은 영상을 선택했고, 재미있어서 끝까지 볼 만한 영상을 중점으로 살폈습니다. 또 구독자 수가 많은 채널은 조회수가 더 빨리 오를 거라고 생각해 선택했습니다. 감사합니다.",
-            "회귀분석 결과 및 그래프 설명": "예시) 안녕하세요, 저는 저희 조에서 회귀식을 설명하고, 100만 조회수를 달성하는 시점을 예측할 ○○○입니다. 저희가 구한 회귀식은 다음과 같습니다. y = □x² + □x + □ 이 식을 이용해 계산해본 결과, 약 □□일 후에 조회수가 100만 회에 도달할 것으로 예측했습니다. 실제 데이터와 비교했을 때, 저희 예측이 얼마나 정확한지 확인할 수 있었습니다. 감사합니다. 또한 저희 회귀식 그래프는 아래로 볼록한 이차함수 형태이며, 다음과 같은 특징을 가집니다. 꼭짓점은 (□□, □□)이고 그래프의 대칭축은 x=□□, y절편은 □□입니다.",
-            "적합도 평가": "예시) 안녕하세요, 저는 저희 조의 적합도 평가를 맡은 ○○○입니다. 저희는 예측 모델이 실제 조회수 데이터를 얼마나 잘 설명하는지를 확인하기 위해 평균 오차를 사용했습니다. 저희 결과는 약 **□□□**였습니다. 이 수치는 예측이 실제 데이터와 비교적 가까운 편이라는 것을 보여줍니다. 하지만 일부 시점에서는 예측값과 실제값의 차이가 크게 나는 구간도 있었는데, 그 이유는 영상이 갑자기 바이럴되었거나, 광고 효과가 컸던 시점 때문이라고 생각합니다. 이런 적합도 평가를 통해 단순히 회귀식을 세우는 것뿐 아니라, 그 식이 얼마나 믿을 만한지도 함께 판단할 수 있어서 좋았습니다. 감사합니다.",
-            "마케팅 전략": "예시) 안녕하세요, 저는 저희 조의 마케팅 전략 정리를 맡은 ○○○입니다. 저희 조는 분석한 결과를 바탕으로 다음과 같은 전략을 세웠습니다. 광고를 이용해 영상이 초반에 빨리 퍼질 수 있도록 합니다. 제목과 썸네일을 자극적으로 만들어 클릭률을 높입니다. 영상 길이를 짧게 만들어 사람들이 끝까지 볼 수 있게 합니다. 댓글을 자주 달고 시청자들과 소통하여 지속적인 관심을 유도합니다. 이러한 전략을 통해 저희 예측값과 실제 조회수의 차이를 줄일 수 있을 거라 생각합니다. 감사합니다.",
-            "느낀점 및 종합 정리": "예시) 안녕하세요, 저는 저희 조의 프로젝트 수업 소감을 맡은 ○○○입니다. 저는 이번 프로젝트를 통해 실제로 유튜브 영상의 조회수를 수학으로 예측할 수 있다는 점이 흥미로웠습니다. 처음에는 수학이 현실에서 별로 쓰이지 않을 줄 알았는데, 이번 활동을 하면서 수학이 생각보다 실생활과 많이 연결되어 있다는 것을 알게 됐습니다. 특히, 실제 데이터로 분석하고 예측했던 경험이 아주 재미있고 유익했습니다. 감사합니다."
-        }
-
-
-        # ── 대본 작성 영역 ─────────────────────────────
-        script_key = f"script_{session}_{my_role}"
-        script = st.text_area("대본을 작성해 보세요 ✍️",value=script_templates.get(my_role, ""), key=script_key, height=250,
-                            placeholder="여기에 발표 대본을 적어 보세요…")
-
-        col1, col2 = st.columns(2)
-        with col1:
-            # ② 버튼 – on_click으로 콜백 연결
-            prompt = (
-                f"역할: {my_role}\n"
-                "발표 주제: 유튜브 이차회귀 분석 결과\n"
-                "200자 내외 발표 대본 작성"
-            )
-            st.button(
-                "💡 스크립트 예시 생성(GPT)",
-                on_click=fill_example,
-                args=(prompt, script_key)
-            )
-
-        with col2:
-            if st.button("📑 저장 & 요약", key="save_summary"):
-                if not script.strip():
-                    st.error("대본이나 토의 내용을 입력해야 저장할 수 있습니다.")
-                    st.stop()
-
-                # ① GPT 요약
-                with st.spinner("GPT에게 요약을 부탁하는 중…"):
-                    summary = summarize_discussion(script)
-
-                # ② 시트 저장
-                timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-                row = [session, my_role, timestamp, script, summary]
-                try:
-                    ss = gc.open_by_key(yt_id)
-                    ws = ss.worksheet("토의요약")   # 미리 생성
-                    safe_append(ws, row)
-                    st.success("스프레드시트에 저장되었습니다!")
-                except Exception as e:
-                    st.error(f"스프레드시트 저장 중 오류: {e}")
-
-                # ③ 요약 출력
-                st.markdown("### ✂️ GPT 요약본")
-                st.write(summary)
 #교사용 대시보드 만들기
+@st.cache_resource(show_spinner=False)
+def get_class_report() -> ClassReport:
+    """반 전체 회귀 결과 캐시 (프로세스당 하나, 교사 세션끼리 공유)."""
+    return ClassReport()
+
+DIGEST_SHEET = "교사요약"   # [시트, 반·조, 시각, 제출 수, 종합] – 미리 생성
+
+def pending_submissions() -> Dict[str, list]:
+    """제출 시트별로 지난번 일괄 요약 이후 새로 들어온 행."""
+    store = get_sheet_store()
+    out = {}
+    for name, layout in SHEET_LAYOUTS.items():
+        key = sheet_key(yt_id, name)
+        sync_sheet(key)
+        rows = store.rows_since(key, store.cursor(f"digest/{key}"))
+        out[name] = (rows, entries_from_rows(rows, layout))
+    return out
+
+def run_teacher_digest() -> List[DigestResult]:
+    """
+    새 제출물을 여러 개씩 묶어 요약하고 반·조별 종합을 만듭니다.
+    행별 요약은 시트별 batch_update 한 번으로, 종합은 기록 큐로 한꺼번에 씁니다.
+    """
+    store, cache, queue = get_sheet_store(), get_gpt_cache(), get_append_queue()
+    client = get_openai()
+    summarizer = BatchSummarizer(lambda messages, **p: cache.chat(client, "gpt-3.5-turbo", messages, **p))
+    digest_ws = open_worksheet(sheet_key(yt_id, DIGEST_SHEET))
+    timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    results = []
+    for name, (rows, entries) in pending_submissions().items():
+        if not rows:
+            continue
+        key = sheet_key(yt_id, name)
+        if entries:
+            res = summarizer.run(name, entries)
+            if res.new_summaries:
+                col = SHEET_LAYOUTS[name].summary_col
+                open_worksheet(key).batch_update(
+                    [{"range": rowcol_to_a1(r, col + 1), "values": [[s]]}
+                     for r, s in res.new_summaries.items()],
+                    value_input_option="USER_ENTERED")
+                store.set_cells(key, {r: {col: s} for r, s in res.new_summaries.items()})
+            sizes = {}
+            for e in entries:
+                sizes[e.group] = sizes.get(e.group, 0) + 1
+            for group, digest in res.digests.items():
+                queue.put(digest_ws, [name, group, timestamp, sizes[group], digest])
+            results.append(res)
+        # 요약을 받지 못한 행(응답 누락·파싱 실패)부터는 다음 실행 때 다시 처리
+        missing = [e.row_num for e in entries if not e.summary]
+        done_to = min(missing) - 1 if missing else rows[-1][0]
+        if done_to > store.cursor(f"digest/{key}"):
+            store.set_cursor(f"digest/{key}", done_to)
+    return results
+
 def teacher_ui():
     st.title("🧑‍🏫 교사용 대시보드")
-    df = pd.DataFrame(load_sheet_records(yt_name), columns=["학번","video_id","timestamp","viewCount"])
+    show_write_failures()
+    # youtube 시트는 로컬 미러에서 한 번만 읽고, 학번·video_id별 묶음을 그대로 사용
+    store = get_sheet_store()
+    key = sheet_key(yt_id, yt_name)
+    # 시트에서 행을 고치거나 지운 뒤 로컬 미러가 어긋나 보이면 처음부터 다시 받기
+    if st.sidebar.button("시트 다시 불러오기", key="teacher_reload_sheets"):
+        for k in [key] + [sheet_key(yt_id, name) for name in SHEET_LAYOUTS]:
+            store.reset(k)
+        get_sheet_versions().invalidate(yt_id)
+        sync_sheet(key, force=True)
+    else:
+        sync_sheet(key)
+    parts = get_view_partitions()
+    parts.ensure(store.version(key), lambda: store.records(key))
+
+    report = get_class_report()
+    with st.spinner("학생별 회귀 분석 중..."):
+        updated = report.refresh(parts.groups())
+    df = report.table()
     if df.empty:
-        st.info("데이터가 없습니다."); return
-    st.metric("제출 건수", len(df))
-    st.metric("평균 조회수", int(df["viewCount"].mean()))
-    st.dataframe(df.tail(20))
+        st.info("데이터가 없습니다."); return
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("학생 수", df["sid"].nunique())
+    col2.metric("제출 건수", int(df["n"].sum()))
+    col3.metric("평균 MAPE", f"{df['mape'].mean():.1f}%")
+    st.caption(f"이번에 다시 계산한 학생: {updated}명 (나머지는 이전 결과 사용)")
+
+    # 열 제목을 눌러 정렬할 수 있는 반 전체 표
+    table = df.rename(columns={
+        "sid": "학번", "video_id": "기록한 영상", "n": "기록 수",
+        "mape": "MAPE(%)", "r2": "R²", "grade": "등급", "note": "비고",
+        "hour_to_target": "100만 도달(시간)", "predicted_at": "100만 도달 예상 시각",
+    })
+    st.dataframe(
+        table[["학번", "기록한 영상", "기록 수", "a", "b", "c", "MAPE(%)", "R²", "등급",
+               "100만 도달(시간)", "100만 도달 예상 시각", "비고"]],
+        hide_index=True,
+        column_config={
+            "a": st.column_config.NumberColumn(format="%.6f"),
+            "b": st.column_config.NumberColumn(format="%.6f"),
+            "c": st.column_config.NumberColumn(format="%.4f"),
+            "MAPE(%)": st.column_config.NumberColumn(format="%.1f"),
+            "R²": st.column_config.NumberColumn(format="%.3f"),
+            "100만 도달(시간)": st.column_config.NumberColumn(format="%.1f"),
+        },
+    )
+
+    # ─── 제출물 일괄 요약 ───────────────────────────────────────
+    with st.expander("📝 의견·기준·토의 제출물 일괄 요약"):
+        # 제출 시트 동기화는 교사가 켰을 때만 (대시보드 재실행마다 하지 않음)
+        if st.toggle("새 제출물 확인", key="teacher_digest_check"):
+            pending = pending_submissions()
+            entries = [e for _, es in pending.values() for e in es]
+            calls, tokens = estimate_cost(entries)
+            st.caption(f"지난번 이후 새 제출물 {len(entries)}건 · 예상 요청 {calls}회 (약 {tokens:,} 토큰)")
+            if st.button("새 제출물 요약하기", key="teacher_digest", disabled=not entries):
+                with st.spinner("제출물을 묶어서 요약하는 중..."):
+                    st.session_state["teacher_digests"] = run_teacher_digest()
+        for res in st.session_state.get("teacher_digests", []):
+            st.markdown(f"#### {res.sheet} · {len(res.entries)}건 (요청 {res.requests}회)")
+            if res.errors:
+                st.warning("일부 요청이 실패했습니다. 요약을 받지 못한 제출물은 다음 실행 때 다시 요약합니다.\n\n"
+                           + "\n".join(f"- {err}" for err in res.errors))
+            for group, digest in res.digests.items():
+                st.markdown(f"**{group}**")
+                st.write(digest)
+            st.dataframe(pd.DataFrame(
+                [{"행": e.row_num, "반·조": e.group, "요약": e.summary} for e in res.entries]),
+                hide_index=True)
+
+# 조회수 자동 수집 시작 (프로세스당 한 번)
+collector = get_collector()
 
 # === 메인 탭 구조 ===
 tab1, tab2 = st.tabs(["로그인", "회원가입"])
@@ -889,42 +1207,52 @@ with tab2:
     else:
         st.info("이미 로그인된 상태입니다.")
 
-if "history" not in st.session_state:
-    st.session_state["history"] = []
-
-st.sidebar.markdown("## 🗨️ AI 챗봇")
-with st.sidebar.form("chat_form", clear_on_submit=True):
-    chat_input = st.text_input("질문을 입력하세요", key="chat_input")
-    submitted = st.form_submit_button("전송")
-
-if submitted:
-    # 2) API 호출
-    messages = [{"role":"system","content":"당신은 친절한 수학 튜터입니다."}]
-    # 대화 히스토리도 포함시키려면:
-    for role, msg in st.session_state["history"]:
-        messages.append({
-                "role":"user" if role=="🧑‍🎓" else "assistant", 
-                "content":msg
-        })
-    messages.append({"role":"user","content": chat_input})
+# 챗봇 문맥: 화면에는 전체 기록, API에는 요약 + 최근 대화만
+if "chat" not in st.session_state:
+    st.session_state["chat"] = ChatContext("당신은 친절한 수학 튜터입니다.")
 
-    res = openai.chat.completions.create(
-        model="gpt-3.5-turbo", messages=messages
-    )
-    answer = res.choices[0].message.content
+@st.fragment
+def chat_panel(chat: ChatContext):
+    """사이드바 챗봇. 질문을 보내도 챗봇 패널만 다시 실행됩니다."""
+    st.markdown("## 🗨️ AI 챗봇")
+    with st.form("chat_form", clear_on_submit=True):
+        chat_input = st.text_input("질문을 입력하세요", key="chat_input")
+        submitted = st.form_submit_button("전송")
 
-    # 3) 히스토리에 추가
-    st.session_state["history"].append(("🧑‍🎓", chat_input))
-    st.session_state["history"].append(("🤖", answer))
+    if not (submitted and chat_input.strip()):
+        return
 
-    # 5) 대화 내용 보여주기
-    if st.session_state["history"]:
-        for role, msg in st.session_state["history"][-1:]:
-            st.sidebar.markdown(f"**{role}:** {msg}")
+    # 1) API 호출 (토큰이 도착하는 대로 표시)
+    messages = chat.messages(chat_input)
+    st.markdown(f"**🧑‍🎓:** {chat_input}")
+    st.markdown("**🤖:**")
+    stream = get_openai().chat.completions.create(
+        model="gpt-3.5-turbo", messages=messages, stream=True
+    )
+    answer = st.write_stream(stream_text(stream))
+
+    # 2) 히스토리에 추가하고, 최근 창에서 밀려난 대화는 백그라운드에서 요약
+    chat.add(chat_input, answer)
+    fold = chat.fold_request()
+    if fold is not None:
+        cache, client = get_gpt_cache(), get_openai()
+        def fold_summary():
+            try:
+                summary = cache.chat(client, "gpt-3.5-turbo", fold, max_tokens=SUMMARY_MAX_TOKENS)
+            except Exception:
+                chat.fold_done(None)
+                raise
+            chat.fold_done(summary)
+            return summary
+        get_job_queue().submit(fold_summary, estimate_tokens(fold, SUMMARY_MAX_TOKENS),
+                               label="chat_summary")
 
     with st.expander("이전 대화 기록 보기"):
-        if len(st.session_state["history"]) > 1:
-            for role, msg in st.session_state["history"][:-1]:
+        if len(chat.history) > 2:
+            for role, msg in chat.history[:-2]:
                 st.markdown(f"**{role}:** {msg}")
         else:
-            st.markdown("이전 대화 내역이 없습니다.")
\ No newline at end of file
+            st.markdown("이전 대화 내역이 없습니다.")
+
+with st.sidebar:
+    chat_panel(st.session_state["chat"])
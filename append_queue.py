@@ -0,0 +1,137 @@
+# append_queue.py 시트 기록 묶음 전송 큐 (백그라운드 스레드)
+import atexit, logging, threading, time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Tuple
+
+import gspread
+
+from sheet_store import SheetStore, is_quota_error, updated_row, worksheet_key
+
+log = logging.getLogger(__name__)
+
+MAX_BATCH = 50       # 이만큼 쌓이면 바로 전송
+MAX_DELAY = 2.0      # 초: 첫 행이 들어온 뒤 이 시간이 지나면 전송
+MAX_BACKOFF = 60.0   # 초: 429 재시도 간격 상한
+MAX_ATTEMPTS = 5     # 429가 아닌 오류가 이 횟수를 넘으면 실패로 표시 (재시도는 MAX_BACKOFF 간격으로 계속)
+CLOSE_TIMEOUT = 30.0
+
+SENT, PENDING, FAILING = "sent", "pending", "failing"
+
+
+class AppendQueue:
+    """
+    워크시트별로 행을 모아 append_rows 한 번으로 보냅니다.
+    429 재시도는 백그라운드 스레드에서 처리하므로 페이지 렌더링을 막지 않고,
+    전송 전 행은 SheetStore의 대기 목록에 남아 있어 읽기에 바로 보이고
+    프로세스가 종료되더라도 다음 실행 때 다시 전송됩니다.
+    계속 실패하는 시트는 버리지 않고 재시도하면서 failing()/status()로 알려 줍니다.
+    """
+
+    def __init__(self, store: SheetStore, open_ws: Callable[[str], Any],
+                 max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._store = store
+        self._open_ws = open_ws
+        self._cond = threading.Condition()
+        self._buf: Dict[str, List[Tuple[int, List[Any]]]] = defaultdict(list)
+        self._first: Dict[str, float] = {}      # 시트별 가장 오래된 대기 행의 시각
+        self._retry_at: Dict[str, float] = {}
+        self._attempts: Dict[str, int] = defaultdict(int)
+        self._ws: Dict[str, Any] = {}
+        self._failing: Dict[str, str] = {}      # 시트 → 마지막 오류 (MAX_ATTEMPTS 넘게 실패 중)
+        self._closed = False
+
+        # 지난 실행에서 보내지 못한 행 복구
+        for key, items in store.pending_rows().items():
+            self._buf[key].extend(items)
+            self._first[key] = time.time()
+
+        self._thread = threading.Thread(target=self._run, name="sheet-append-queue", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, ws, row: List[Any]) -> int:
+        """행을 대기열에 넣고 바로 돌아옵니다. status()로 확인할 대기 행 id를 돌려줍니다."""
+        key = worksheet_key(ws)
+        pid = self._store.add_pending(key, row)
+        with self._cond:
+            self._ws[key] = ws
+            self._buf[key].append((pid, row))
+            self._first.setdefault(key, time.time())
+            if len(self._buf[key]) >= self.max_batch:
+                self._cond.notify()
+        return pid
+
+    def pending(self) -> int:
+        with self._cond:
+            return sum(len(v) for v in self._buf.values())
+
+    def status(self, pid: int) -> str:
+        """대기 행 id의 전송 상태: SENT, PENDING(전송 대기), FAILING(재시도 중이지만 계속 실패)."""
+        key = self._store.pending_sheet(pid)
+        if key is None:
+            return SENT
+        with self._cond:
+            return FAILING if key in self._failing else PENDING
+
+    def failing(self) -> Dict[str, str]:
+        """계속 실패하고 있는 시트와 마지막 오류."""
+        with self._cond:
+            return dict(self._failing)
+
+    def close(self, timeout: float = CLOSE_TIMEOUT):
+        """남은 행을 모두 전송하고 스레드를 종료합니다 (종료 시 자동 호출)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    # ---- 백그라운드 ----
+    def _due(self, now: float) -> List[str]:
+        return [k for k, items in self._buf.items()
+                if items and self._retry_at.get(k, 0) <= now
+                and (self._closed or len(items) >= self.max_batch
+                     or now - self._first.get(k, now) >= self.max_delay)]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    keys = self._due(time.time())
+                    if keys:
+                        break
+                    if self._closed and not any(self._buf.values()):
+                        return
+                    self._cond.wait(timeout=0.2)
+                batches = {k: self._buf.pop(k) for k in keys}
+                for k in keys:
+                    self._first.pop(k, None)
+            for key, items in batches.items():
+                self._flush(key, items)
+
+    def _flush(self, key: str, items: List[Tuple[int, List[Any]]]):
+        rows = [row for _, row in items]
+        try:
+            ws = self._ws.get(key) or self._open_ws(key)
+            self._ws[key] = ws
+            resp = ws.append_rows(rows, value_input_option="USER_ENTERED")
+        except Exception as e:
+            quota = isinstance(e, gspread.exceptions.APIError) and is_quota_error(e)
+            self._attempts[key] += 1
+            wait = min(2 ** min(self._attempts[key], 16), MAX_BACKOFF)
+            with self._cond:
+                if not quota and self._attempts[key] >= MAX_ATTEMPTS:
+                    # 버리지 않고 계속 재시도하되, 읽는 쪽에서 알 수 있게 실패로 표시
+                    if key not in self._failing:
+                        log.error("시트 기록 실패 (%s, %d행): %s", key, len(rows), e)
+                    self._failing[key] = str(e)
+                self._buf[key][:0] = items
+                self._first[key] = time.time() - self.max_delay
+                self._retry_at[key] = time.time() + wait
+            return
+        self._attempts.pop(key, None)
+        self._retry_at.pop(key, None)
+        with self._cond:
+            self._failing.pop(key, None)
+        self._store.confirm_pending(key, [pid for pid, _ in items], rows, updated_row(resp))
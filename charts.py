@@ -0,0 +1,331 @@
+# charts.py 회귀 그래프 (브라우저용 Altair 스펙 + 다운로드용 PNG 캐시, LRU)
+import hashlib, io, logging, os, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+DPI = 150
+CACHE_SIZE = 128   # 보관할 PNG 수
+MAX_POINTS = 1000  # 그래프에 보내는 최대 점 수 (넘으면 모양을 유지하며 줄임)
+FONT_PATH = os.path.join("fonts", "NanumGothic.otf")
+
+
+def data_hash(*arrays: Any) -> str:
+    """학생 데이터(배열·Series)의 내용 해시 (캐시 키용)."""
+    h = hashlib.sha1()
+    for arr in arrays:
+        arr = np.asarray(arr)
+        if np.issubdtype(arr.dtype, np.datetime64):
+            arr = arr.astype("datetime64[ns]").view("int64")
+        h.update(np.ascontiguousarray(arr, dtype="float64").tobytes())
+    return h.hexdigest()
+
+
+class PlotCache:
+    """(키 → PNG 바이트) LRU 캐시. 여러 세션이 함께 쓰므로 잠금으로 보호합니다."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            png = self._data.get(key)
+            if png is not None:
+                self._data.move_to_end(key)
+            return png
+
+    def put(self, key: Hashable, png: bytes):
+        with self._lock:
+            self._data[key] = png
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+_cache = PlotCache()
+_index_cache = PlotCache(maxsize=256)   # 다운샘플 인덱스 (PNG 대신 배열 보관)
+# matplotlib은 스레드 안전하지 않으므로 렌더링 전용 스레드 하나에서만 그림
+_renderer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plot-render")
+
+
+_Figure = None
+
+
+def _matplotlib():
+    """matplotlib은 첫 렌더링 때 import하고 한글 글꼴도 그때 한 번만 등록합니다."""
+    global _Figure
+    if _Figure is None:
+        from matplotlib import font_manager as fm, rcParams
+        from matplotlib.figure import Figure
+        if os.path.exists(FONT_PATH):
+            fm.fontManager.addfont(FONT_PATH)
+            rcParams["font.family"] = fm.FontProperties(fname=FONT_PATH).get_name()
+        else:
+            log.warning("한글 글꼴 %s 이(가) 없어 PNG의 한글이 깨질 수 있습니다.", FONT_PATH)
+        rcParams["axes.unicode_minus"] = False
+        _Figure = Figure
+    return _Figure
+
+
+def _render(draw: Callable, figsize, args) -> bytes:
+    # pyplot을 거치지 않는 Figure라 전역 상태에 남지 않고, 끝나면 바로 해제
+    # (렌더링 스레드가 하나뿐이라 초기화도 한 번만 실행됨)
+    fig = _matplotlib()(figsize=figsize)
+    try:
+        ax = fig.subplots()
+        draw(ax, *args)
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png', dpi=DPI, bbox_inches='tight')
+        return buf.getvalue()
+    finally:
+        fig.clear()
+
+
+def cached_png(key: Hashable, draw: Callable, *args, figsize=(6, 6)) -> bytes:
+    """키에 해당하는 PNG를 돌려주고, 없을 때만 렌더링 스레드에서 그립니다."""
+    png = _cache.get(key)
+    if png is None:
+        png = _renderer.submit(_render, draw, figsize, args).result()
+        _cache.put(key, png)
+    return png
+
+
+# ==== 다운샘플링 (LTTB) ====
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: 구간마다 앞뒤 점과 가장 큰 삼각형을 만드는 점 하나를 골라
+    급등·급락 같은 모양을 유지한 채 n_out개로 줄입니다. 첫 점과 마지막 점은 항상 포함.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)   # 가운데 n_out-2개 구간의 경계
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], edges[i + 2])
+            cx, cy = x[nxt].mean(), y[nxt].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def _as_float(values) -> np.ndarray:
+    arr = np.asarray(values)
+    if np.issubdtype(arr.dtype, np.datetime64):
+        arr = arr.astype("datetime64[ns]").view("int64")
+        return (arr - arr[0]).astype(float) if len(arr) else arr.astype(float)
+    return arr.astype(float)
+
+
+def downsample(x, y, max_points: int = MAX_POINTS, x_range=None) -> np.ndarray:
+    """
+    그래프에 그릴 점의 인덱스 (x 오름차순 가정). x_range=(시작, 끝)이면 그 구간만 보고 줄입니다.
+    같은 데이터·점 수·구간이면 캐시된 결과를 씁니다. 적합도 계산에는 쓰지 말고 그리기에만 쓰세요.
+    """
+    key = (data_hash(x, y), max_points, x_range)
+    idx = _index_cache.get(key)
+    if idx is None:
+        base = np.arange(len(x))
+        if x_range is not None:
+            xs = np.asarray(x)
+            base = base[(xs >= x_range[0]) & (xs <= x_range[1])]
+        idx = base[lttb_indices(_as_float(np.asarray(x)[base]), np.asarray(y, dtype=float)[base],
+                                max_points)]
+        _index_cache.put(key, idx)
+    return idx
+
+
+def _thin(timestamps, y_original, max_points: int = MAX_POINTS, t_range=None):
+    """
+    (시각, 조회수)를 그리기용으로 줄여서 돌려줍니다.
+    t_range=(시작, 끝) 시각이면 그 구간의 점만 골라 줄이므로, 좁은 구간일수록 원본에 가깝게 보입니다.
+    """
+    ts = pd.to_datetime(pd.Series(timestamps)).reset_index(drop=True)
+    y = np.asarray(y_original, dtype=float)
+    x_range = None if t_range is None else tuple(pd.Timestamp(t).to_datetime64() for t in t_range)
+    if len(y) <= max_points and x_range is None:
+        return ts, y
+    idx = downsample(ts.values, y, max_points, x_range)
+    return ts.iloc[idx].reset_index(drop=True), y[idx]
+
+
+# ==== 그래프 그리기 ====
+
+def draw_selected(ax, x_hours, y_scaled):
+    """2차시: 선택된 세 점 산점도."""
+    ax.scatter(x_hours, y_scaled, s=100, color='steelblue', label="선택된 세 점 (만 단위)")
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.set_xlabel('경과 시간 (시간 단위)')
+    ax.set_ylabel('조회수 (단위: 만 회)')
+    ax.legend()
+
+
+def draw_detail(ax, timestamps, y_original, base, a, b, c, x_max):
+    """2차시: 실제 조회수 + 회귀 곡선."""
+    timestamps, y_original = _thin(timestamps, y_original)
+    ax.scatter(timestamps, y_original, alpha=0.5, label="실제 조회수")
+    ts_curve = np.linspace(0, x_max, 200)
+    y_curve = (a * ts_curve**2 + b * ts_curve + c) * 10000
+    x_curve_timestamps = base + pd.to_timedelta(ts_curve * 3600, unit='s')
+    ax.plot(x_curve_timestamps, y_curve, color='red', linewidth=2, label="회귀 곡선")
+    ax.set_xlabel('시간')
+    ax.set_ylabel('조회수')
+    ax.legend()
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+def draw_power(ax, timestamps, y_original, base, a, b, c, x_now, y_ad, y_time_now, y_total_now):
+    """3차시: 시간 모델 곡선과 광고 효과(Power 모델)를 더한 곡선."""
+    time_poly = np.poly1d([a, b, c])
+    t_now = base + pd.to_timedelta(x_now * 3600, 's')
+
+    # 실제 데이터
+    timestamps, y_original = _thin(timestamps, y_original)
+    ax.scatter(timestamps, y_original, alpha=0.5, label="실제 조회수")
+
+    # 시간 모델 곡선 (광고 없음)
+    ts_curve = np.linspace(0, x_now, 200)
+    y_curve = time_poly(ts_curve) * 10000
+    times = base + pd.to_timedelta(ts_curve * 3600, 's')
+    ax.plot(times, y_curve, linestyle="--", color="orange", lw=2, label="시간 모델 (광고 없음)")
+
+    # 광고효과를 더한 Power 모델 곡선
+    ax.plot(times, y_curve + y_ad, color="red", lw=2, label="시간 모델 + 광고 효과")
+
+    # 현재 시점 예측점
+    ax.scatter(t_now, y_time_now, color="green", s=80, label="광고 전 예측")
+    ax.scatter(t_now, y_total_now, color="red",   s=100, label="광고 후 예측")
+
+    ax.set_xlabel("시간")
+    ax.set_ylabel("조회수 (원 단위)")
+    ax.legend()
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+# ==== 브라우저 렌더링 차트 (Altair / Vega-Lite) ====
+# 서버는 데이터와 스펙만 보내고, 그리기·확대·툴팁은 브라우저에서 처리
+# PNG는 다운로드를 요청할 때만 위 cached_png로 그림
+
+def _alt():
+    import altair as alt
+    return alt
+
+
+def _curve_frame(base, a, b, c, x_max, n: int = 200, x_min: float = 0) -> pd.DataFrame:
+    ts_curve = np.linspace(x_min, x_max, n)
+    return pd.DataFrame({
+        "시간": base + pd.to_timedelta(ts_curve * 3600, unit='s'),
+        "조회수": (a * ts_curve**2 + b * ts_curve + c) * 10000,
+    })
+
+
+def _series_color(domain, range_):
+    alt = _alt()
+    return alt.Color("구분:N", scale=alt.Scale(domain=domain, range=range_),
+                     legend=alt.Legend(title=None, orient="bottom"))
+
+
+def selected_chart(x_hours, y_scaled):
+    """2차시: 선택된 세 점 산점도."""
+    alt = _alt()
+    data = pd.DataFrame({"경과 시간 (시간)": np.asarray(x_hours, dtype=float),
+                         "조회수 (만 회)": np.asarray(y_scaled, dtype=float)})
+    return alt.Chart(data).mark_circle(size=120, color="steelblue").encode(
+        x="경과 시간 (시간):Q", y="조회수 (만 회):Q",
+        tooltip=[alt.Tooltip("경과 시간 (시간):Q", format=",.2f"),
+                 alt.Tooltip("조회수 (만 회):Q", format=",.2f")],
+    ).properties(title="선택된 세 점 (만 단위)").interactive()
+
+
+def detail_chart(timestamps, y_original, base, a, b, c, x_max, t_range=None):
+    """
+    2차시: 실제 조회수 + 회귀 곡선.
+    t_range=(시작, 끝)이면 그 구간만 보여 주고, 점도 그 구간 안에서 다시 골라 더 자세히 그립니다.
+    """
+    alt = _alt()
+    color = _series_color(["실제 조회수", "회귀 곡선"], ["#1f77b4", "red"])
+    timestamps, y_original = _thin(timestamps, y_original, t_range=t_range)
+    points = pd.DataFrame({"시간": timestamps.values, "조회수": y_original, "구분": "실제 조회수"})
+    x_min = 0
+    if t_range is not None:
+        hours = [(pd.Timestamp(t) - base).total_seconds() / 3600 for t in t_range]
+        x_min, x_max = max(hours[0], 0), min(hours[1], x_max)
+    curve = _curve_frame(base, a, b, c, x_max, x_min=x_min).assign(구분="회귀 곡선")
+    tooltip = [alt.Tooltip("시간:T", format="%Y-%m-%d %H:%M"), alt.Tooltip("조회수:Q", format=",.0f")]
+    scatter = alt.Chart(points).mark_circle(opacity=0.5).encode(
+        x="시간:T", y="조회수:Q", color=color, tooltip=tooltip)
+    line = alt.Chart(curve).mark_line(strokeWidth=2).encode(
+        x="시간:T", y="조회수:Q", color=color, tooltip=tooltip)
+    return (scatter + line).interactive()
+
+
+def power_chart(timestamps, y_original, base, a, b, c, x_now, y_ad, y_time_now, y_total_now):
+    """3차시: 시간 모델 곡선과 광고 효과(Power 모델)를 더한 곡선."""
+    alt = _alt()
+    names = ["실제 조회수", "시간 모델 (광고 없음)", "시간 모델 + 광고 효과", "광고 전 예측", "광고 후 예측"]
+    color = _series_color(names, ["#1f77b4", "orange", "red", "green", "darkred"])
+    tooltip = [alt.Tooltip("구분:N"), alt.Tooltip("시간:T", format="%Y-%m-%d %H:%M"),
+               alt.Tooltip("조회수:Q", format=",.0f")]
+
+    timestamps, y_original = _thin(timestamps, y_original)
+    points = pd.DataFrame({"시간": timestamps.values, "조회수": y_original, "구분": names[0]})
+    curve = _curve_frame(base, a, b, c, x_now)
+    curves = pd.concat([curve.assign(구분=names[1]),
+                        curve.assign(조회수=curve["조회수"] + y_ad, 구분=names[2])])
+    t_now = base + pd.to_timedelta(x_now * 3600, 's')
+    now = pd.DataFrame({"시간": [t_now, t_now], "조회수": [y_time_now, y_total_now],
+                        "구분": names[3:]})
+
+    scatter = alt.Chart(points).mark_circle(opacity=0.5).encode(
+        x="시간:T", y="조회수:Q", color=color, tooltip=tooltip)
+    lines = alt.Chart(curves).mark_line(strokeWidth=2).encode(
+        x="시간:T", y="조회수:Q", color=color, tooltip=tooltip,
+        strokeDash=alt.condition(alt.datum.구분 == names[1], alt.value([6, 4]), alt.value([1, 0])))
+    marks = alt.Chart(now).mark_circle(size=120, opacity=1).encode(
+        x="시간:T", y="조회수:Q", color=color, tooltip=tooltip)
+    return (scatter + lines + marks).interactive()
+
+
+def heatmap_chart(table: pd.DataFrame, scheme: str, value_format: str = ",.0f",
+                  na_label: str = ""):
+    """
+    표(행 이름 × 열 이름)를 색칠한 격자로 그립니다 (pandas Styler의 background_gradient 대신,
+    matplotlib 없이 브라우저에서 그림). 값이 NaN인 칸은 회색으로 두고 na_label을 적습니다.
+    """
+    alt = _alt()
+    rows, cols = [str(v) for v in table.index], [str(v) for v in table.columns]
+    data = pd.DataFrame({
+        "행": np.repeat(rows, len(cols)),
+        "열": np.tile(cols, len(rows)),
+        "값": np.asarray(table.values, dtype=float).ravel(),
+    })
+    data["표시"] = [na_label if np.isnan(v) else format(v, value_format) for v in data["값"]]
+    base = alt.Chart(data).encode(
+        x=alt.X("열:N", sort=cols, title=None, axis=alt.Axis(orient="top", labelAngle=0)),
+        y=alt.Y("행:N", sort=rows, title=None),
+    )
+    cells = base.mark_rect().encode(
+        color=alt.condition("isValid(datum.값)",
+                            alt.Color("값:Q", scale=alt.Scale(scheme=scheme), legend=None),
+                            alt.value("#eeeeee")),
+        tooltip=[alt.Tooltip("행:N"), alt.Tooltip("열:N"), alt.Tooltip("값:Q", format=value_format)],
+    )
+    labels = base.mark_text(fontSize=12).encode(text="표시:N")
+    return (cells + labels).properties(height=alt.Step(28))
@@ -0,0 +1,110 @@
+# chat_context.py 사이드바 챗봇 대화 문맥 (최근 대화 창 + 이전 대화 요약, 토큰 상한)
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from gpt_jobs import estimate_tokens
+
+USER, BOT = "🧑‍🎓", "🤖"
+WINDOW_TURNS = 6            # 그대로 보내는 최근 메시지 수 (질문·답 합쳐서)
+MAX_PROMPT_TOKENS = 1500    # 요청 한 번에 보내는 토큰 상한 (추정치)
+SUMMARY_MAX_TOKENS = 200
+
+
+def _tokens(messages: List[Dict[str, str]]) -> int:
+    return estimate_tokens(messages, max_tokens=0)
+
+
+def _clip(text: str, limit: int) -> str:
+    """추정 토큰(글자 수)이 limit을 넘으면 앞부분만 남깁니다."""
+    if len(text) <= limit:
+        return text
+    return text[:max(limit - 6, 0)] + " …(생략)"
+
+
+class ChatContext:
+    """
+    전체 대화 기록은 화면 표시용으로만 보관하고, API에는
+    시스템 프롬프트 + 이전 대화 요약 + 최근 대화 몇 개 + 새 질문만 보냅니다.
+    최근 창에서 밀려난 대화는 백그라운드에서 요약에 합칩니다.
+    """
+
+    def __init__(self, system: str, window: int = WINDOW_TURNS,
+                 max_prompt_tokens: int = MAX_PROMPT_TOKENS):
+        self.system = system
+        self.window = window
+        self.max_prompt_tokens = max_prompt_tokens
+        self.history: List[Tuple[str, str]] = []
+        self.summary = ""
+        self._summarized = 0            # history 중 요약에 반영된 메시지 수
+        self._folding = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _message(role: str, text: str) -> Dict[str, str]:
+        return {"role": "user" if role == USER else "assistant", "content": text}
+
+    def messages(self, question: str) -> List[Dict[str, str]]:
+        """
+        이번 요청에 보낼 메시지. 토큰 상한을 넘으면 오래된 대화부터 빼고,
+        그래도 넘치면 질문과 요약을 잘라서 상한 안에 맞춥니다.
+        아직 요약에 반영되지 않은 대화(요약 중인 것 포함)는 최근 창 밖이어도 그대로 보냅니다.
+        """
+        with self._lock:
+            summary = self.summary
+            recent = [self._message(r, t) for r, t in self.history[self._summarized:]]
+        system = [{"role": "system", "content": self.system}]
+        prefix = "지금까지의 대화 요약: "
+        budget = self.max_prompt_tokens - _tokens(system)
+        q_cost = _tokens([{"content": question}])
+        s_cost = _tokens([{"content": prefix + summary}]) if summary else 0
+        if q_cost + s_cost > budget:
+            # 질문을 우선하되(예산의 3/4까지) 요약 자리도 남겨 둠
+            q_limit = max(budget - s_cost, budget * 3 // 4) - 8
+            question = _clip(question, q_limit)
+            if summary:
+                summary = _clip(summary, budget - _tokens([{"content": question}]) - 8 - len(prefix))
+        head = list(system)
+        if summary:
+            head.append({"role": "system", "content": prefix + summary})
+        tail = [{"role": "user", "content": question}]
+        while recent and _tokens(head + recent + tail) > self.max_prompt_tokens:
+            recent.pop(0)
+        return head + recent + tail
+
+    def add(self, question: str, answer: str):
+        with self._lock:
+            self.history += [(USER, question), (BOT, answer)]
+
+    def fold_request(self) -> Optional[List[Dict[str, str]]]:
+        """
+        최근 창 밖으로 밀려났지만 아직 요약되지 않은 대화가 있으면 요약 요청 메시지를,
+        없거나 이미 요약 중이면 None을 돌려줍니다.
+        """
+        with self._lock:
+            end = len(self.history) - self.window
+            if self._folding or end <= self._summarized:
+                return None
+            self._folding = True
+            self._fold_end = end
+            old = "\n".join(f"{'학생' if r == USER else '튜터'}: {t}"
+                            for r, t in self.history[self._summarized:end])
+            prev = self.summary
+        prompt = (f"기존 요약:\n{prev or '(없음)'}\n\n새 대화:\n{old}\n\n"
+                  "학생이 무엇을 물었고 어떤 설명을 들었는지 중심으로 300자 이내로 요약을 갱신해 주세요.")
+        return [{"role": "system", "content": "당신은 대화 내용을 간결히 요약하는 AI입니다."},
+                {"role": "user", "content": prompt}]
+
+    def fold_done(self, summary: Optional[str]):
+        """요약 결과를 반영합니다 (실패하면 None, 다음 질문 때 다시 시도)."""
+        with self._lock:
+            if summary:
+                self.summary = summary.strip()
+                self._summarized = self._fold_end
+            self._folding = False
+
+
+def stream_text(stream: Any) -> Iterator[str]:
+    """chat.completions.create(stream=True) 응답에서 글자 조각만 꺼냅니다."""
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
@@ -0,0 +1,146 @@
+# class_report.py 교사용 반 전체 회귀 분석 (프로세스 풀 일괄 계산, 학생별 결과 캐시)
+import hashlib, multiprocessing, threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from evaluation import FitEvaluator
+from regression import VIEW_UNIT, batch_time_to_target, best_triple
+
+TARGET_VIEWS = 1_000_000
+MAX_WORKERS = 4
+MIN_PARALLEL = 4    # 다시 계산할 학생이 이보다 적으면 프로세스 풀 없이 바로 계산
+
+
+@dataclass
+class StudentFit:
+    """학번 하나의 2차시 회귀 결과 (video_id는 그 학생이 기록한 영상 목록)."""
+    sid: str
+    video_id: str
+    n: int
+    a: float = np.nan
+    b: float = np.nan
+    c: float = np.nan
+    mape: float = np.nan
+    r2: float = np.nan
+    grade: str = ""
+    note: str = ""
+
+
+def fit_student(sid: str, video_id: str, x_sec: np.ndarray, y: np.ndarray) -> StudentFit:
+    """
+    학생 화면의 '회귀 분석하기'와 같은 방법으로 세 점을 고르고 적합도를 평가합니다.
+    (프로세스 풀에서 실행되므로 모듈 최상위 함수로 둡니다.)
+    """
+    result = StudentFit(sid, video_id, len(x_sec))
+    if len(x_sec) < 3:
+        result.note = "기록 3개 미만"
+        return result
+    found = best_triple(x_sec, y)
+    idxs = list(found[0]) if found else [0, 1, 2]
+    if not found:
+        result.note = "증가 조건을 만족하는 세 점 없음"
+    x_hours = x_sec / 3600
+    a, b, c = np.polyfit(x_hours[idxs], y[idxs] / VIEW_UNIT, 2)
+    evaluator = FitEvaluator(a, b, c)
+    evaluator.sync(x_hours, y)
+    report = evaluator.report()
+    result.a, result.b, result.c = float(a), float(b), float(c)
+    result.mape, result.r2, result.grade = report.mape, report.r2, report.grade
+    return result
+
+
+def _fit_args(sid: str, video_id: str, df: pd.DataFrame) -> Tuple:
+    base = df['timestamp'].min()
+    x_sec = (df['timestamp'] - base).dt.total_seconds().values
+    return sid, video_id, x_sec, df['viewcount'].astype(float).values
+
+
+def _signature(df: pd.DataFrame) -> str:
+    h = hashlib.sha1()
+    h.update(df['timestamp'].values.astype("datetime64[ns]").view("int64").tobytes())
+    h.update(df['viewcount'].values.astype("float64").tobytes())
+    return h.hexdigest()
+
+
+class ClassReport:
+    """
+    반 전체 학번별 회귀 결과를 보관합니다 (학생 화면과 같게 학번의 전체 기록으로 적합).
+    기록이 바뀐 학생만 프로세스 풀에서 다시 계산하고, 나머지는 캐시를 그대로 씁니다.
+    프로세스 풀은 처음 필요할 때 한 번 만들어 계속 씁니다. 여러 스레드가 돌고 있는
+    서버 프로세스를 fork하면 교착될 수 있으므로 spawn 방식으로 띄웁니다.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._fits: Dict[str, Tuple[str, StudentFit, pd.Timestamp]] = {}
+
+    def refresh(self, groups: Iterable[Tuple[str, str, pd.DataFrame]]) -> int:
+        """현재 기록 (학번, 영상 목록, 기록)에 맞춥니다. 새로 계산한 학생 수를 돌려줍니다."""
+        with self._lock:
+            seen, todo = set(), []
+            for sid, vid, df in groups:
+                if df.empty:
+                    continue
+                key = sid
+                seen.add(key)
+                sig = f"{_signature(df)}|{vid}"
+                cached = self._fits.get(key)
+                if cached is None or cached[0] != sig:
+                    todo.append((key, sig, df['timestamp'].min(), _fit_args(sid, vid, df)))
+            for key in list(self._fits):
+                if key not in seen:
+                    del self._fits[key]
+            if not todo:
+                return 0
+            jobs = [args for *_, args in todo]
+            if len(todo) < MIN_PARALLEL or self.max_workers <= 1:
+                fits = [fit_student(*args) for args in jobs]
+            else:
+                try:
+                    fits = list(self._executor().map(fit_student, *zip(*jobs)))
+                except BrokenProcessPool:
+                    # 워커가 죽었으면 이번에는 바로 계산하고 다음에 풀을 새로 만듦
+                    self._pool = None
+                    fits = [fit_student(*args) for args in jobs]
+            for (key, sig, base, _), fit in zip(todo, fits):
+                self._fits[key] = (sig, fit, base)
+            return len(todo)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def close(self):
+        """프로세스 풀을 닫습니다."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def table(self, target_views: float = TARGET_VIEWS) -> pd.DataFrame:
+        """학생별 계수·MAPE·목표 조회수 도달 예상 시점 표 (도달 시점은 한 번에 계산)."""
+        with self._lock:
+            entries = list(self._fits.values())
+        if not entries:
+            return pd.DataFrame()
+        fits: List[StudentFit] = [fit for _, fit, _ in entries]
+        df = pd.DataFrame([asdict(f) for f in fits])
+        hours = batch_time_to_target(df[['a', 'b', 'c']].values, target_views)
+        bases = pd.to_datetime(pd.Series([base for *_, base in entries]))
+        df['hour_to_target'] = hours
+        df['predicted_at'] = bases + pd.to_timedelta(np.nan_to_num(hours, nan=0) * 3600, unit='s')
+        df.loc[~np.isfinite(hours), 'predicted_at'] = pd.NaT
+        return df.sort_values(['sid', 'video_id']).reset_index(drop=True)
+
+    def get(self, sid: str) -> Optional[StudentFit]:
+        cached = self._fits.get(sid)
+        return cached[1] if cached else None
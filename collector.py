@@ -0,0 +1,162 @@
+# collector.py 조회수 자동 수집 (APScheduler)
+import logging, os, socket, sqlite3, threading, time, uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from view_data import parse_timestamps
+from youtube_client import YouTubeClient
+
+log = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_MINUTES = 30
+DEFAULT_TARGET_VIEWS = 1_000_000   # 이 조회수에 도달한 영상은 더 수집하지 않음
+DEFAULT_MAX_AGE_DAYS = 14          # 첫 기록 후 이 기간이 지난 영상은 더 수집하지 않음
+LEASE_PATH = os.path.join(".cache", "collector.sqlite3")
+
+
+def _as_number(v: Any) -> Optional[float]:
+    try:
+        return float(str(v).replace(",", ""))
+    except ValueError:
+        return None
+
+
+class RunnerLease:
+    """
+    같은 캐시 폴더를 쓰는 여러 프로세스 중 하나만 수집하도록 하는 SQLite 임대.
+    임대는 ttl 동안 유효하고, 가진 프로세스가 수집할 때마다 연장합니다.
+    프로세스가 죽으면 ttl이 지난 뒤 다른 프로세스가 이어받습니다.
+    """
+
+    def __init__(self, path: str = LEASE_PATH, name: str = "view_count_collector", ttl: float = 3600):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS leases ("
+                         " name TEXT PRIMARY KEY, holder TEXT, expires_at REAL)")
+
+    def acquire(self) -> bool:
+        """임대를 얻거나 연장하면 True, 다른 프로세스가 가지고 있으면 False."""
+        now = time.time()
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT holder, expires_at FROM leases WHERE name=?",
+                               (self.name,)).fetchone()
+            if row and row[0] != self.holder and row[1] > now:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute("INSERT OR REPLACE INTO leases (name, holder, expires_at) VALUES (?,?,?)",
+                         (self.name, self.holder, now + self.ttl))
+            conn.execute("COMMIT")
+            return True
+        finally:
+            conn.close()
+
+    def release(self):
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("DELETE FROM leases WHERE name=? AND holder=?", (self.name, self.holder))
+
+
+class ViewCountCollector:
+    """
+    기록된 적이 있는 (학번, video_id) 쌍을 모아 두고 일정 간격으로 조회수를 수집합니다.
+    영상 ID는 50개씩 묶어 한 번에 조회하고, 결과는 한 번에 시트에 기록합니다.
+    목표 조회수에 도달했거나 첫 기록 후 max_age_days가 지난 쌍은 더 수집하지 않고,
+    lease가 있으면 임대를 가진 프로세스 하나만 수집합니다.
+    pairs_source는 시트 기록의 (학번, video_id, timestamp, 조회수)를 돌려줍니다.
+    """
+
+    def __init__(self, client: YouTubeClient,
+                 pairs_source: Callable[[], Iterable[Tuple[str, str, Any, Any]]],
+                 append_rows: Callable[[List[list]], None],
+                 interval_minutes: float = DEFAULT_INTERVAL_MINUTES,
+                 target_views: float = DEFAULT_TARGET_VIEWS,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                 lease: Optional[RunnerLease] = None):
+        self.client = client
+        self.interval_minutes = interval_minutes
+        self.target_views = target_views
+        self.max_age = timedelta(days=max_age_days)
+        self.lease = lease
+        self._pairs_source = pairs_source
+        self._append_rows = append_rows
+        self._lock = threading.Lock()
+        self.registry: Set[Tuple[str, str]] = set()
+        self.finished: Set[Tuple[str, str]] = set()   # 목표 도달·기간 만료로 수집을 멈춘 쌍
+        self._scheduler = None
+
+    def register(self, sid: str, vid: str):
+        with self._lock:
+            self.registry.add((str(sid), str(vid)))
+
+    def refresh_registry(self):
+        """시트 기록에서 (학번, video_id) 쌍을 다시 읽어 등록하고, 수집을 멈출 쌍을 고릅니다."""
+        first: Dict[Tuple[str, str], datetime] = {}
+        peak: Dict[Tuple[str, str], float] = {}
+        rows = [(str(s), str(v), ts, views) for s, v, ts, views in self._pairs_source() if s and v]
+        # 시트에서 읽은 값은 표시 형식('2024. 5. 1 오후 3:04:05' 등)이라 youtube 시트와 같은 파서 사용
+        times, _ = parse_timestamps(pd.Series([r[2] for r in rows], dtype=object))
+        for (s, v, _, views), t in zip(rows, times):
+            pair = (s, v)
+            peak.setdefault(pair, 0.0)
+            n = _as_number(views)
+            if not pd.isna(t) and (pair not in first or t < first[pair]):
+                first[pair] = t.to_pydatetime()
+            if n is not None:
+                peak[pair] = max(peak[pair], n)
+        now = datetime.now()
+        finished = {p for p in peak
+                    if peak[p] >= self.target_views
+                    or (p in first and now - first[p] > self.max_age)}
+        with self._lock:
+            self.registry |= set(peak)
+            self.finished = finished
+
+    def collect(self) -> int:
+        """
+        수집 중인 영상의 조회수를 조회해 기록하고, 기록한 행 수를 돌려줍니다.
+        다른 프로세스가 임대를 가지고 있으면 아무것도 하지 않습니다.
+        """
+        if self.lease is not None and not self.lease.acquire():
+            return 0
+        self.refresh_registry()
+        with self._lock:
+            pairs = sorted(self.registry - self.finished)
+        if not pairs:
+            return 0
+        stats = self.client.statistics(vid for _, vid in pairs)
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [[sid, vid, ts, stats[vid]["viewCount"]] for sid, vid in pairs if vid in stats]
+        if rows:
+            self._append_rows(rows)
+        return len(rows)
+
+    def _job(self):
+        try:
+            n = self.collect()
+            log.info("조회수 자동 수집: %d행 기록", n)
+        except Exception:
+            log.exception("조회수 자동 수집 실패")
+
+    def start(self):
+        if self._scheduler is not None:
+            return
+        self._scheduler = BackgroundScheduler(daemon=True)
+        self._scheduler.add_job(self._job, "interval", minutes=self.interval_minutes,
+                                id="view_count_collector", max_instances=1, coalesce=True)
+        self._scheduler.start()
+
+    def shutdown(self):
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+        if self.lease is not None:
+            self.lease.release()
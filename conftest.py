@@ -0,0 +1 @@
+# conftest.py 테스트에서 저장소 최상위 모듈(regression 등)을 바로 import 하도록 경로 기준점으로 둠
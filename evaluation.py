@@ -0,0 +1,141 @@
+# evaluation.py 회귀식 적합도 평가 (MAE·MAPE·RMSE·R², 기록 추가 시 누적 갱신)
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from regression import VIEW_UNIT, LeastSquaresSums
+
+# (MAPE 상한 %, 등급)
+GRADE_BANDS = [
+    (15, "🟢 매우 정확!"),
+    (40, "🟡 보통 수준"),
+    (np.inf, "🔴 개선 필요"),
+]
+
+
+def grade_for(mape: float) -> str:
+    for limit, grade in GRADE_BANDS:
+        if mape <= limit:
+            return grade
+    return GRADE_BANDS[-1][1]
+
+
+class StreamingMetrics:
+    """고정된 예측식에 대한 오차 누적합. 새 기록이 들어오면 그 행만 더합니다."""
+
+    def __init__(self):
+        self.n = 0
+        self.sum_abs = 0.0     # Σ|e|
+        self.sum_ape = 0.0     # Σ|e| / (y + 1)
+        self.sum_sq = 0.0      # Σe²
+        self.sum_y = 0.0
+        self.sum_y2 = 0.0
+
+    def update(self, y, y_pred):
+        y = np.asarray(y, dtype=float)
+        err = y - np.asarray(y_pred, dtype=float)
+        self.n += len(y)
+        self.sum_abs += float(np.abs(err).sum())
+        self.sum_ape += float((np.abs(err) / (y + 1)).sum())
+        self.sum_sq += float((err ** 2).sum())
+        self.sum_y += float(y.sum())
+        self.sum_y2 += float((y ** 2).sum())
+
+    @property
+    def mae(self) -> float:
+        return self.sum_abs / self.n if self.n else np.nan
+
+    @property
+    def mape(self) -> float:
+        return self.sum_ape / self.n * 100 if self.n else np.nan
+
+    @property
+    def rmse(self) -> float:
+        return float(np.sqrt(self.sum_sq / self.n)) if self.n else np.nan
+
+    @property
+    def r2(self) -> float:
+        if not self.n:
+            return np.nan
+        sst = self.sum_y2 - self.sum_y ** 2 / self.n
+        return 1 - self.sum_sq / sst if sst > 0 else np.nan
+
+    def as_dict(self) -> dict:
+        return {"MAE": self.mae, "MAPE(%)": self.mape, "RMSE": self.rmse, "R²": self.r2}
+
+
+@dataclass
+class FitReport:
+    x_hours: np.ndarray
+    y: np.ndarray            # 실제 조회수 (원 단위)
+    y_pred: np.ndarray       # 예측 조회수 (원 단위)
+    mae: float
+    mape: float
+    rmse: float
+    r2: float
+    grade: str
+    lsq_coefs: Optional[Tuple[float, float, float]] = None
+    lsq_metrics: Optional[dict] = None
+
+    @property
+    def residuals(self) -> np.ndarray:
+        return self.y - self.y_pred
+
+
+class FitEvaluator:
+    """
+    하나의 회귀식(a, b, c)에 대한 적합도 평가.
+    예측값·잔차·지표는 한 번만 계산해 두고, 기록이 뒤에 추가되면 새 행만 반영합니다.
+    모든 점을 쓰는 최소제곱 이차식과의 비교도 함께 제공합니다.
+    """
+
+    def __init__(self, a: float, b: float, c: float):
+        self.coefs = (a, b, c)
+        self._reset()
+
+    def _reset(self):
+        self.x_hours = np.empty(0)
+        self.y = np.empty(0)
+        self.y_pred = np.empty(0)
+        self.metrics = StreamingMetrics()
+        self._lsq = LeastSquaresSums(1.0, 1 / VIEW_UNIT)
+        self._report: Optional[FitReport] = None
+
+    def _predict(self, x_hours: np.ndarray) -> np.ndarray:
+        a, b, c = self.coefs
+        return (a * x_hours**2 + b * x_hours + c) * VIEW_UNIT
+
+    def sync(self, x_hours, y) -> int:
+        """현재 데이터에 맞춥니다 (앞부분이 같으면 추가분만). 새로 반영한 행 수를 돌려줍니다."""
+        x_hours = np.asarray(x_hours, dtype=float)
+        y = np.asarray(y, dtype=float)
+        n = len(self.x_hours)
+        if len(x_hours) < n or not (np.array_equal(x_hours[:n], self.x_hours)
+                                    and np.array_equal(y[:n], self.y)):
+            self._reset()
+            n = 0
+        if len(x_hours) > n:
+            x_new, y_new = x_hours[n:], y[n:]
+            pred_new = self._predict(x_new)
+            self.metrics.update(y_new, pred_new)
+            self._lsq.add(x_new, y_new)
+            self.x_hours, self.y = x_hours, y
+            self.y_pred = np.concatenate([self.y_pred, pred_new])
+            self._report = None
+        return len(x_hours) - n
+
+    def report(self) -> FitReport:
+        if self._report is None:
+            m = self.metrics
+            lsq = self._lsq.solve()
+            lsq_metrics = None
+            if lsq is not None:
+                ref = StreamingMetrics()
+                a, b, c = lsq
+                ref.update(self.y, (a * self.x_hours**2 + b * self.x_hours + c) * VIEW_UNIT)
+                lsq_metrics = ref.as_dict()
+            self._report = FitReport(self.x_hours, self.y, self.y_pred,
+                                     m.mae, m.mape, m.rmse, m.r2, grade_for(m.mape),
+                                     lsq, lsq_metrics)
+        return self._report
@@ -0,0 +1,121 @@
+# gpt_cache.py GPT 응답 캐시 (내용 해시 키, TTL·LRU, SQLite 보관, 동시 요청 합치기)
+import hashlib, json, os, sqlite3, threading, time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_PATH = os.path.join(".cache", "gpt.sqlite3")
+DEFAULT_TTL = 7 * 24 * 3600   # 초: 같은 요청이면 일주일 동안 저장된 응답 사용
+MAX_ENTRIES = 2000            # 보관할 응답 수 (넘으면 가장 오래 안 쓴 것부터 삭제)
+MEMORY_ENTRIES = 256          # 메모리에 함께 들고 있을 응답 수
+
+
+def request_key(model: str, messages: List[Dict[str, str]], **params: Any) -> str:
+    """모델·메시지·temperature 등 요청 내용 전체의 해시."""
+    payload = json.dumps({"model": model, "messages": messages, **params},
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    요청 내용이 같으면 API를 다시 부르지 않고 저장된 응답을 돌려줍니다.
+    같은 요청이 동시에 여러 개 들어오면 첫 요청만 API를 부르고 나머지는 그 결과를 기다립니다.
+    실패한 호출은 저장하지 않습니다.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = DEFAULT_TTL,
+                 max_entries: int = MAX_ENTRIES, memory_entries: int = MEMORY_ENTRIES):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()   # key → (응답, 저장 시각)
+        self._inflight: Dict[str, Future] = {}
+        self.hits = self.misses = self.coalesced = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, response TEXT, created_at REAL, used_at REAL)")
+
+    # ---- 저장소 ----
+    def _lookup(self, key: str, now: float) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key=?", (key,)).fetchone()
+            entry = tuple(row) if row else None
+        if entry is None:
+            return None
+        if now - entry[1] > self.ttl:
+            self._memory.pop(key, None)
+            with self._conn:
+                self._conn.execute("DELETE FROM responses WHERE key=?", (key,))
+            return None
+        self._remember(key, entry)
+        with self._conn:
+            self._conn.execute("UPDATE responses SET used_at=? WHERE key=?", (now, key))
+        return entry[0]
+
+    def _remember(self, key: str, entry: tuple):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _store(self, key: str, response: str, now: float):
+        self._remember(key, (response, now))
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, used_at) VALUES (?,?,?,?)",
+                (key, response, now, now))
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key NOT IN ("
+                " SELECT key FROM responses ORDER BY used_at DESC LIMIT ?)", (self.max_entries,))
+
+    # ---- 조회 ----
+    def get_or_create(self, key: str, create: Callable[[], str]) -> str:
+        """key의 응답. 없으면 create()로 만들고 저장합니다 (같은 key의 동시 호출은 한 번만 실행)."""
+        with self._lock:
+            cached = self._lookup(key, time.time())
+            if cached is not None:
+                self.hits += 1
+                return cached
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+        try:
+            response = create()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._store(key, response, time.time())
+            self._inflight.pop(key, None)
+        future.set_result(response)
+        return response
+
+    def chat(self, client: Any, model: str, messages: List[Dict[str, str]], **params: Any) -> str:
+        """client.chat.completions.create 결과 텍스트 (캐시 사용)."""
+        def create():
+            res = client.chat.completions.create(model=model, messages=messages, **params)
+            return res.choices[0].message.content.strip()
+        return self.get_or_create(request_key(model, messages, **params), create)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            with self._conn:
+                self._conn.execute("DELETE FROM responses")
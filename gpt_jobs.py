@@ -0,0 +1,122 @@
+# gpt_jobs.py GPT 요약·시트 기록 백그라운드 작업 큐 (동시 실행 수·분당 토큰 제한, 재시도)
+import itertools, logging, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+MAX_WORKERS = 4               # 동시에 실행할 GPT 호출 수
+TOKENS_PER_MINUTE = 40_000    # 분당 토큰 예산 (요청 + 최대 응답 토큰 추정치)
+MAX_ATTEMPTS = 3
+RETRY_BASE = 2.0              # 초: 재시도 대기 (2, 4, 8…)
+KEEP_FINISHED = 3600          # 초: 끝난 작업 결과를 보관하는 시간
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int = 300) -> int:
+    """대략적인 토큰 수 (한글은 글자당 1토큰 안팎이라 글자 수로 어림) + 응답 상한."""
+    return sum(len(m.get("content", "")) for m in messages) + 8 * len(messages) + max_tokens
+
+
+class TokenBucket:
+    """분당 토큰 예산. 남은 예산이 모자라면 채워질 때까지 기다립니다."""
+
+    def __init__(self, per_minute: float = TOKENS_PER_MINUTE):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float):
+        tokens = min(float(tokens), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass
+class Job:
+    id: int
+    label: str
+    status: str = QUEUED
+    result: Any = None
+    error: str = ""
+    attempts: int = 0
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+class JobQueue:
+    """
+    GPT 호출처럼 오래 걸리는 작업을 스레드 풀에서 실행하고 작업 번호를 돌려줍니다.
+    페이지는 번호로 상태를 확인(폴링)하므로 응답을 기다리는 동안에도 다른 활동을 계속할 수 있습니다.
+    작업이 성공하면 on_done(결과)을 같은 워커에서 실행합니다 (예: 시트 기록 큐에 넣기).
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, tokens_per_minute: float = TOKENS_PER_MINUTE,
+                 max_attempts: int = MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self._bucket = TokenBucket(tokens_per_minute)
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="gpt-job")
+        self._jobs: Dict[int, Job] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[], Any], tokens: int = 0, label: str = "",
+               on_done: Optional[Callable[[Any], None]] = None) -> int:
+        with self._lock:
+            self._prune()
+            job = Job(next(self._ids), label)
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job, fn, tokens, on_done)
+        return job.id
+
+    def get(self, job_id: Optional[int]) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(not j.finished for j in self._jobs.values())
+
+    def _prune(self):
+        cutoff = time.time() - KEEP_FINISHED
+        for jid in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[jid]
+
+    def _run(self, job: Job, fn: Callable[[], Any], tokens: int,
+             on_done: Optional[Callable[[Any], None]]):
+        job.status = RUNNING
+        while True:
+            job.attempts += 1
+            self._bucket.acquire(tokens)
+            try:
+                result = fn()
+                if on_done is not None:
+                    on_done(result)
+            except Exception as e:
+                if job.attempts < self.max_attempts:
+                    time.sleep(RETRY_BASE ** job.attempts)
+                    continue
+                log.error("작업 실패 (%s): %s", job.label, e)
+                job.error = str(e)
+                job.status = FAILED
+            else:
+                job.result = result
+                job.status = DONE
+            job.finished_at = time.time()
+            return
@@ -0,0 +1,451 @@
+# regression.py 이차 회귀 세 점 선택 엔진
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional, Tuple
+
+# 한 번에 평가할 세 점 조합 수 (메모리 상한)
+DEFAULT_CHUNK = 500_000
+VIEW_UNIT = 10000   # 회귀식의 y는 만 단위
+
+
+def iter_triples(n: int, chunk_size: Optional[int] = DEFAULT_CHUNK
+                 ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    combinations(range(n), 3)과 같은 순서로 (i, j, k) 인덱스 배열을 내보냅니다.
+    chunk_size가 None이면 모든 조합을 한 번에, 아니면 청크 단위로 나눠서 돌려줍니다.
+    """
+    if n < 3:
+        return
+    if chunk_size is None:
+        chunk_size = n ** 3
+    chunk_size = max(int(chunk_size), 1)
+    for i in range(n - 2):
+        j = i + 1
+        while j < n - 1:
+            # j마다 k는 (j+1 … n-1) → 누적합으로 청크에 들어갈 j 범위 결정
+            lens = n - 1 - np.arange(j, n - 1)
+            cum = np.cumsum(lens)
+            take = max(int(np.searchsorted(cum, chunk_size, side="right")), 1)
+            js, lens = np.arange(j, j + take), lens[:take]
+            total = int(lens.sum())
+            J = np.repeat(js, lens)
+            starts = np.repeat(np.cumsum(lens) - lens, lens)
+            K = J + 1 + (np.arange(total) - starts)
+            I = np.full(total, i)
+            yield I, J, K
+            j += take
+
+
+def iter_pairs(m: int, chunk_size: Optional[int] = DEFAULT_CHUNK
+               ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """combinations(range(m), 2)와 같은 순서로 (i, j) 인덱스 배열을 청크 단위로 내보냅니다."""
+    total = m * (m - 1) // 2
+    if total == 0:
+        return
+    if chunk_size is None:
+        chunk_size = total
+    chunk_size = max(int(chunk_size), 1)
+    # i행이 시작하는 순번: i*(2m-i-1)/2
+    rows = np.arange(m - 1)
+    offsets = rows * (2 * m - rows - 1) // 2
+    for start in range(0, total, chunk_size):
+        r = np.arange(start, min(start + chunk_size, total))
+        I = np.searchsorted(offsets, r, side="right") - 1
+        yield I, I + 1 + (r - offsets[I])
+
+
+def fit_triples(x: np.ndarray, y: np.ndarray, I: np.ndarray, J: np.ndarray, K: np.ndarray
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """세 점을 지나는 이차식 계수 (a, b, c)를 분할차분(닫힌 형태)으로 한꺼번에 구합니다."""
+    x0, x1, x2 = x[I], x[J], x[K]
+    y0, y1, y2 = y[I], y[J], y[K]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f01 = (y1 - y0) / (x1 - x0)
+        f12 = (y2 - y1) / (x2 - x1)
+        a = (f12 - f01) / (x2 - x0)
+        b = f01 - a * (x0 + x1)
+        c = y0 - f01 * x0 + a * x0 * x1
+    return a, b, c
+
+
+def increasing_mask(a: np.ndarray, b: np.ndarray, c: np.ndarray,
+                    x_first: np.ndarray, x_last: np.ndarray) -> np.ndarray:
+    """아래로 볼록(a>0)이고 양 끝점 기울기가 모두 양수인 후보만 True."""
+    finite = np.isfinite(a) & np.isfinite(b) & np.isfinite(c)
+    with np.errstate(invalid="ignore"):
+        return (finite & (a > 0)
+                & (2 * a * x_first + b > 0)
+                & (2 * a * x_last + b > 0))
+
+
+def triple_mse(x: np.ndarray, y: np.ndarray, I: np.ndarray, J: np.ndarray, K: np.ndarray,
+               a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """각 후보 이차식의 세 점에 대한 평균제곱오차 (세 점을 정확히 지나므로 반올림 오차 수준)."""
+    xs = np.stack([x[I], x[J], x[K]])
+    ys = np.stack([y[I], y[J], y[K]])
+    with np.errstate(invalid="ignore", over="ignore"):
+        return np.mean((ys - (a * xs**2 + b * xs + c))**2, axis=0)
+
+
+def _best_in_chunk(x: np.ndarray, y: np.ndarray, I: np.ndarray, J: np.ndarray, K: np.ndarray
+                   ) -> Optional[Tuple[Tuple[int, int, int], float]]:
+    """
+    주어진 후보(combinations() 순서) 중 조건을 만족하는 첫 조합과 그 세 점 MSE.
+    세 점 MSE는 모든 조합에서 0(반올림 오차)이라 크기 비교는 의미가 없으므로 순서로 고릅니다.
+    """
+    a, b, c = fit_triples(x, y, I, J, K)
+    mask = increasing_mask(a, b, c, x[I], x[K])
+    if not mask.any():
+        return None
+    pos = int(np.argmax(mask))
+    sel = slice(pos, pos + 1)
+    mse = triple_mse(x, y, I[sel], J[sel], K[sel], a[sel], b[sel], c[sel])
+    return (int(I[pos]), int(J[pos]), int(K[pos])), float(mse[0])
+
+
+def best_triple(x, y, chunk_size: Optional[int] = DEFAULT_CHUNK
+                ) -> Optional[Tuple[Tuple[int, int, int], float]]:
+    """
+    세 점 조합 중 순증가 조건을 만족하는 조합을 찾습니다.
+    반환값은 ((i, j, k), 세 점 MSE), 조건을 만족하는 조합이 없으면 None 입니다.
+    기존 수업 코드는 '세 점 MSE가 가장 작은 조합'을 골랐지만 세 점을 지나는 이차식의 세 점 MSE는
+    항상 0(반올림 오차)이므로, 동점을 combinations() 순서로 깨서 조건을 만족하는 첫 조합을 고릅니다.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    for I, J, K in iter_triples(len(x), chunk_size):
+        found = _best_in_chunk(x, y, I, J, K)
+        if found:
+            return found
+    return None
+
+
+def best_curve_triple(x, y, chunk_size: Optional[int] = DEFAULT_CHUNK
+                      ) -> Optional[Tuple[Tuple[int, int, int], float]]:
+    """
+    순증가 조건을 만족하는 세 점 곡선 중 전체 데이터 MSE가 가장 작은 조합 ((i, j, k), MSE).
+    조합마다 전체 점을 다시 보지 않고 거듭제곱 합 Σx^k(k=0..4), Σx^k·y(k=0..2), Σy²로
+    오차 제곱합을 구합니다. 자릿수 손실을 막으려고 x, y를 표준화해서 계산합니다
+    (세 점 곡선과 증가 조건은 x·y의 양의 일차 변환에 대해 그대로 유지됨).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n < 3 or np.ptp(x) == 0:
+        return None
+    sx, sy = x.std(), y.std() or 1.0
+    xs, ys = (x - x.mean()) / sx, (y - y.mean()) / sy
+    S = [float(np.sum(xs ** k)) for k in range(5)]
+    T = [float(np.sum(ys * xs ** k)) for k in range(3)]
+    Y2 = float(np.sum(ys ** 2))
+    best = None
+    for I, J, K in iter_triples(n, chunk_size):
+        a, b, c = fit_triples(xs, ys, I, J, K)
+        mask = increasing_mask(a, b, c, xs[I], xs[K])
+        if not mask.any():
+            continue
+        with np.errstate(invalid="ignore", over="ignore"):
+            sse = (Y2 - 2 * (a * T[2] + b * T[1] + c * T[0])
+                   + a * a * S[4] + 2 * a * b * S[3] + (2 * a * c + b * b) * S[2]
+                   + 2 * b * c * S[1] + c * c * S[0])
+        sse = np.where(mask, np.maximum(sse, 0), np.inf)
+        pos = int(np.argmin(sse))
+        if best is None or sse[pos] < best[1]:
+            best = ((int(I[pos]), int(J[pos]), int(K[pos])), float(sse[pos]))
+    if best is None:
+        return None
+    return best[0], best[1] * sy * sy / n
+
+
+# ==== 후보 탐색 전략 ====
+SEARCH_STRATEGIES = {
+    "exhaustive": "전체 탐색 (모든 세 점)",
+    "stratified": "구간 후보 (처음·중간·끝 구간)",
+    "sampled":    "무작위 표본 (N개 조합, 고정 시드)",
+}
+
+
+@dataclass
+class TripleSearch:
+    """세 점 탐색 결과와, 전체 데이터 MSE가 가장 작은 세 점 곡선(best_curve_triple) 대비 근접도."""
+    strategy: str
+    idxs: Optional[Tuple[int, int, int]]
+    mse: float
+    evaluated: int
+    curve_mse: float = np.nan          # 선택된 곡선의 전체 데이터 MSE
+    optimum_mse: float = np.nan        # 가장 잘 맞는 세 점 곡선의 전체 데이터 MSE
+    same_as_optimum: Optional[bool] = None
+
+    @property
+    def gap_pct(self) -> float:
+        """가장 잘 맞는 세 점 곡선보다 전체 데이터 MSE가 몇 % 더 큰지 (0이면 동일)."""
+        if not np.isfinite(self.curve_mse) or not np.isfinite(self.optimum_mse):
+            return np.nan
+        return (self.curve_mse - self.optimum_mse) / max(self.optimum_mse, 1e-12) * 100
+
+
+def _all_triples(n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """모든 세 점 조합을 하나의 배열 묶음으로."""
+    chunks = list(iter_triples(n, None))
+    if not chunks:
+        empty = np.empty(0, dtype=int)
+        return empty, empty, empty
+    I, J, K = (np.concatenate(v) for v in zip(*chunks))
+    return I, J, K
+
+
+def stratified_triples(n: int, window: int = 10) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """처음·중간·끝 구간에서 한 점씩 고른 조합 (window³개 이하)."""
+    if n <= 3 * window:
+        return _all_triples(n)
+    mid = n // 2 - window // 2
+    start = np.arange(window)
+    middle = np.arange(mid, mid + window)
+    end = np.arange(n - window, n)
+    I, J, K = np.meshgrid(start, middle, end, indexing="ij")
+    return I.ravel(), J.ravel(), K.ravel()
+
+
+def _unrank_pairs(m: np.ndarray, r: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """combinations(range(m), 2)에서 r번째 (0부터) 조합 (m, r은 같은 길이의 배열)."""
+    with np.errstate(invalid="ignore"):
+        a = np.floor(((2 * m - 1) - np.sqrt(np.maximum((2 * m - 1) ** 2 - 8 * r, 0))) / 2)
+    a = np.clip(a.astype(np.int64), 0, np.maximum(m - 2, 0))
+    # 부동소수 오차 보정: a행 시작 순번 ≤ r < a+1행 시작 순번
+    for _ in range(2):
+        a = np.where(a * (2 * m - a - 1) // 2 > r, a - 1, a)
+        a = np.where((a + 1) * (2 * m - a - 2) // 2 <= r, a + 1, a)
+    return a, a + 1 + (r - a * (2 * m - a - 1) // 2)
+
+
+def unrank_triples(n: int, ranks) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """combinations(range(n), 3) 순서의 순번들을 (i, j, k) 인덱스 배열로 바꿉니다."""
+    r = np.asarray(ranks, dtype=np.int64)
+    # i가 시작하는 순번: C(n,3) - C(n-i,3)
+    i = np.arange(max(n - 2, 0), dtype=np.int64)
+    rest = n - i
+    offsets = n * (n - 1) * (n - 2) // 6 - rest * (rest - 1) * (rest - 2) // 6
+    I = np.searchsorted(offsets, r, side="right") - 1
+    a, b = _unrank_pairs(n - I - 1, r - offsets[I])
+    return I, I + 1 + a, I + 1 + b
+
+
+def sampled_triples(n: int, budget: int = 20_000, seed: int = 42
+                    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """무작위로 뽑은 서로 다른 세 점 조합 정확히 budget개 (같은 시드면 같은 결과)."""
+    total = n * (n - 1) * (n - 2) // 6
+    if total <= budget:
+        return _all_triples(n)
+    rng = np.random.default_rng(seed)
+    # 조합 순번을 중복 없이 뽑아 되돌림 (정렬해 두면 동점일 때 전체 탐색과 같은 순서로 고름)
+    ranks = np.sort(rng.choice(total, size=budget, replace=False))
+    return unrank_triples(n, ranks)
+
+
+def curve_mse(x, y, idxs) -> float:
+    """세 점으로 만든 이차식이 전체 데이터에 대해 갖는 MSE."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    I, J, K = (np.array([v]) for v in idxs)
+    a, b, c = fit_triples(x, y, I, J, K)
+    return float(np.mean((y - (a[0] * x**2 + b[0] * x + c[0]))**2))
+
+
+def search_triple(x, y, strategy: str = "exhaustive", budget: int = 20_000,
+                  seed: int = 42, window: int = 10, compare: bool = False) -> TripleSearch:
+    """
+    선택한 전략으로 최적 세 점을 찾습니다.
+    compare=True이면 전체 데이터 MSE가 가장 작은 세 점 곡선과 비교해 근접도(gap_pct)를 함께 기록합니다.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if strategy == "exhaustive":
+        found = best_triple(x, y)
+        evaluated = n * (n - 1) * (n - 2) // 6
+    else:
+        if strategy == "stratified":
+            I, J, K = stratified_triples(n, window)
+        elif strategy == "sampled":
+            I, J, K = sampled_triples(n, budget, seed)
+        else:
+            raise ValueError(f"알 수 없는 탐색 전략: {strategy}")
+        found = _best_in_chunk(x, y, I, J, K) if len(I) else None
+        evaluated = len(I)
+
+    result = TripleSearch(strategy, found[0] if found else None,
+                          found[1] if found else np.nan, evaluated)
+    if found:
+        result.curve_mse = curve_mse(x, y, found[0])
+    if compare:
+        optimum = best_curve_triple(x, y)
+        if optimum:
+            result.optimum_mse = curve_mse(x, y, optimum[0])
+            result.same_as_optimum = bool(found) and found[0] == optimum[0]
+    return result
+
+
+# ==== 증분 재적합 ====
+class IncrementalFit:
+    """
+    기록이 뒤에 추가될 때마다 전체를 다시 탐색하지 않고 갱신합니다.
+    best_triple과 같은 조합을 유지하고, 새 점을 포함하는 조합만 확인합니다 (새 점 하나당 O(n²) 이하).
+    모든 점 최소제곱 이차식은 evaluation.FitEvaluator가 같은 방식(누적합)으로 갱신합니다.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = DEFAULT_CHUNK):
+        self.chunk_size = chunk_size
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self.best: Optional[Tuple[Tuple[int, int, int], float]] = None
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def sync(self, x, y) -> int:
+        """
+        현재 데이터(x, y)에 맞춥니다. 기존 데이터가 앞부분과 같으면 추가된 점만 반영하고,
+        아니면(수정·삭제·순서 변경) 처음부터 다시 계산합니다. 새로 반영한 점 수를 돌려줍니다.
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        n = len(self.x)
+        if len(x) < n or not (np.array_equal(x[:n], self.x) and np.array_equal(y[:n], self.y)):
+            self.__init__(self.chunk_size)
+            n = 0
+        for k in range(n, len(x)):
+            self.add(x[k], y[k])
+        return len(x) - n
+
+    def add(self, x_new: float, y_new: float):
+        """점 하나를 뒤에 추가 (x는 시간순이어야 함)."""
+        self.x = np.append(self.x, float(x_new))
+        self.y = np.append(self.y, float(y_new))
+        m = len(self.x) - 1
+        if m < 2:
+            return
+        # 새 점 m을 포함하는 조합 (i, j, m) 중 조건을 만족하는 첫 조합 (청크 단위 평가)
+        found = None
+        for I, J in iter_pairs(m, self.chunk_size):
+            found = _best_in_chunk(self.x, self.y, I, J, np.full(len(I), m))
+            if found:
+                break
+        # best_triple과 같게 combinations() 순서상 앞선 조합 유지
+        if found and (self.best is None or found[0] < self.best[0]):
+            self.best = found
+
+
+class LeastSquaresSums:
+    """최소제곱 이차식을 위한 누적합 Σx^k(k=0..4), Σx^k·y(k=0..2)."""
+
+    def __init__(self, x_scale: float = 1.0, y_scale: float = 1.0):
+        self.x_scale = x_scale
+        self.y_scale = y_scale
+        self.sx = np.zeros(5)
+        self.sxy = np.zeros(3)
+
+    def add(self, x, y):
+        """점(또는 배열) 추가."""
+        xs = np.atleast_1d(np.asarray(x, dtype=float)) * self.x_scale
+        ys = np.atleast_1d(np.asarray(y, dtype=float)) * self.y_scale
+        powers = xs[:, None] ** np.arange(5)
+        self.sx += powers.sum(axis=0)
+        self.sxy += (ys[:, None] * powers[:, :3]).sum(axis=0)
+
+    def solve(self) -> Optional[Tuple[float, float, float]]:
+        if self.sx[0] < 3:
+            return None
+        s0, s1, s2, s3, s4 = self.sx
+        A = np.array([[s4, s3, s2], [s3, s2, s1], [s2, s1, s0]])
+        try:
+            a, b, c = np.linalg.solve(A, self.sxy[::-1])
+        except np.linalg.LinAlgError:
+            return None
+        return float(a), float(b), float(c)
+
+
+# ==== 이차 모델 (계수 보관·목표 시점 계산) ====
+
+
+def solve_time_to_target(a, b, c, target, x_min=0.0) -> np.ndarray:
+    """
+    y = a x² + b x + c 가 target 이상이 되는 x ≥ x_min 중 가장 이른 시점 (닫힌 형태, 배열 가능).
+    x_min에서 이미 target 이상이면 x_min, 끝내 도달하지 못하면 NaN.
+    """
+    a, b, c, target, x_min = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (a, b, c, target, x_min)))
+    cc = c - target
+    with np.errstate(divide="ignore", invalid="ignore"):
+        disc = b * b - 4 * a * cc
+        sq = np.sqrt(np.where(disc >= 0, disc, np.nan))
+        # 상쇄 오차를 피하는 근의 공식
+        q = -0.5 * (b + np.copysign(sq, b))
+        r1 = np.where(a != 0, q / a, -cc / b)
+        r2 = np.where(a != 0, cc / q, np.nan)
+    roots = np.stack([r1, r2])
+    roots = np.where(np.isfinite(roots) & (roots >= x_min), roots, np.inf).min(axis=0)
+    reached = a * x_min**2 + b * x_min + cc >= 0
+    out = np.where(reached, x_min, roots)
+    return np.where(np.isfinite(out), out, np.nan)
+
+
+def batch_time_to_target(coefs, target_views: float = 1_000_000, extra_views=0.0,
+                         x_min=0.0) -> np.ndarray:
+    """여러 학생의 (a, b, c) 배열(shape n×3)에 대해 목표 조회수 도달 시점(시간)을 한 번에 계산."""
+    coefs = np.asarray(coefs, dtype=float).reshape(-1, 3)
+    target = (target_views - np.asarray(extra_views, dtype=float)) / VIEW_UNIT
+    return solve_time_to_target(coefs[:, 0], coefs[:, 1], coefs[:, 2], target, x_min)
+
+
+@dataclass
+class QuadraticModel:
+    """
+    2차시 회귀 결과. y(만) = a x² + b x + c, x는 base로부터의 경과 시간(시간 단위).
+    학생 기록 전체의 예측·지표는 evaluation.FitEvaluator가 추가분만 계산해 보관합니다.
+    """
+    a: float
+    b: float
+    c: float
+    base: Any = None
+
+    @property
+    def coefs(self) -> Tuple[float, float, float]:
+        return self.a, self.b, self.c
+
+    def predict(self, x_hours) -> np.ndarray:
+        """만 단위 예측."""
+        x = np.asarray(x_hours, dtype=float)
+        return self.a * x**2 + self.b * x + self.c
+
+    def predict_views(self, x_hours) -> np.ndarray:
+        """원 단위(실제 조회수) 예측."""
+        return self.predict(x_hours) * VIEW_UNIT
+
+    @property
+    def axis(self) -> float:
+        """대칭축 x = -b / 2a."""
+        return -self.b / (2 * self.a) if self.a else np.nan
+
+    @property
+    def vertex(self) -> Tuple[float, float]:
+        x = self.axis
+        return x, float(self.predict(x)) if np.isfinite(x) else np.nan
+
+    @property
+    def y_intercept(self) -> float:
+        return self.c
+
+    def time_to_target(self, target_views: float = 1_000_000, extra_views: float = 0.0,
+                       x_min: float = 0.0) -> float:
+        """
+        (광고 효과 extra_views를 더한) 예측 조회수가 target_views에 도달하는 경과 시간.
+        도달하지 못하면 NaN.
+        """
+        return float(batch_time_to_target([self.coefs], target_views, extra_views, x_min)[0])
+
+    def time_at(self, x_hours: float):
+        """경과 시간 → 실제 시각 (base가 있을 때)."""
+        if self.base is None or not np.isfinite(x_hours):
+            return None
+        return self.base + pd.to_timedelta(x_hours * 3600, unit="s")
@@ -0,0 +1,328 @@
+# sheet_store.py 구글 시트 로컬 미러 (SQLite, 새로 추가된 행만 동기화)
+import json, os, re, sqlite3, threading, time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import gspread
+from gspread.utils import numericise_all, rowcol_to_a1
+
+DEFAULT_PATH = os.path.join(".cache", "sheets.sqlite3")
+SYNC_TTL = 30  # 초: 이 시간 안에는 시트를 다시 조회하지 않고 로컬 데이터만 사용
+
+
+def sheet_key(spreadsheet_id: str, sheet_name: str) -> str:
+    return f"{spreadsheet_id}/{sheet_name}"
+
+
+def worksheet_key(ws) -> str:
+    return sheet_key(ws.spreadsheet.id, ws.title)
+
+
+def is_quota_error(e: Exception) -> bool:
+    """gspread APIError가 429(쿼터 초과)인지 확인."""
+    code = getattr(e, "code", None)
+    if code is None:
+        code = getattr(getattr(e, "response", None), "status_code", None)
+    return code == 429
+
+
+def updated_row(resp: Any) -> Optional[int]:
+    """append_row 응답의 updatedRange('시트'!A42:D42)에서 실제 기록된 행 번호를 꺼냅니다."""
+    try:
+        rng = resp["updates"]["updatedRange"]
+    except (TypeError, KeyError):
+        return None
+    m = re.search(r"!\$?[A-Z]+\$?(\d+)", rng)
+    return int(m.group(1)) if m else None
+
+
+def _cell(v: Any) -> str:
+    # USER_ENTERED로 쓴 '123 같은 텍스트 표기는 시트에서 123으로 보이므로 동일하게 저장
+    if isinstance(v, str):
+        return v[1:] if v.startswith("'") else v
+    return "" if v is None else str(v)
+
+
+class SheetStore:
+    """
+    워크시트별 행을 SQLite에 그대로 보관합니다.
+    동기화는 마지막으로 이어 받은 행 다음부터만 내려받고,
+    앱에서 쓴 행은 시트 기록과 동시에 로컬에도 반영됩니다.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, sync_ttl: float = SYNC_TTL):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.sync_ttl = sync_ttl
+        self._lock = threading.RLock()
+        self._versions: Dict[str, int] = {}   # 시트별 내용 변경 횟수 (캐시 무효화용)
+        self._inflight: Dict[str, threading.Event] = {}   # 지금 내려받는 중인 시트
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta ("
+                " sheet TEXT PRIMARY KEY, header TEXT, synced_row INTEGER, synced_at REAL, token TEXT)")
+            try:   # token 열이 없던 이전 캐시 파일
+                self._conn.execute("ALTER TABLE meta ADD COLUMN token TEXT")
+            except sqlite3.OperationalError:
+                pass
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rows ("
+                " sheet TEXT, row_num INTEGER, data TEXT, PRIMARY KEY (sheet, row_num))")
+            # 아직 시트에 전송되지 않은 행 (재시작 시 다시 보냄)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, sheet TEXT, data TEXT)")
+            # 일괄 작업이 어디까지 처리했는지 (작업 이름 → 마지막 행 번호)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cursors (name TEXT PRIMARY KEY, row_num INTEGER)")
+
+    # ---- 메타 정보 ----
+    def _meta(self, key: str):
+        cur = self._conn.execute(
+            "SELECT header, synced_row, synced_at FROM meta WHERE sheet=?", (key,))
+        row = cur.fetchone()
+        if not row:
+            return None, 1, 0.0
+        return (json.loads(row[0]) if row[0] else None), row[1], row[2]
+
+    def _set_meta(self, key: str, header, synced_row: int, synced_at: float,
+                  token: Optional[str] = None):
+        # token을 주지 않으면 기존 값 유지
+        self._conn.execute(
+            "INSERT INTO meta (sheet, header, synced_row, synced_at, token) VALUES (?,?,?,?,?)"
+            " ON CONFLICT(sheet) DO UPDATE SET header=excluded.header, synced_row=excluded.synced_row,"
+            " synced_at=excluded.synced_at, token=COALESCE(excluded.token, meta.token)",
+            (key, json.dumps(header, ensure_ascii=False) if header else None, synced_row, synced_at,
+             token))
+
+    def _token(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT token FROM meta WHERE sheet=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def version(self, key: str) -> int:
+        """시트 내용이 바뀔 때마다 증가하는 번호 (이 프로세스 기준)."""
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def _bump(self, key: str):
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def needs_sync(self, key: str) -> bool:
+        with self._lock:
+            _, _, synced_at = self._meta(key)
+        return time.time() - synced_at >= self.sync_ttl
+
+    # ---- 읽기 ----
+    def records(self, key: str) -> List[Dict[str, Any]]:
+        """get_all_records()와 같은 형태(헤더 → 값, 숫자 변환)로 로컬 행을 돌려줍니다."""
+        with self._lock:
+            header, _, _ = self._meta(key)
+            cur = self._conn.execute(
+                "SELECT data FROM rows WHERE sheet=? ORDER BY row_num", (key,))
+            rows = [json.loads(d) for (d,) in cur.fetchall()]
+            cur = self._conn.execute(
+                "SELECT data FROM pending WHERE sheet=? ORDER BY id", (key,))
+            rows += [[_cell(v) for v in json.loads(d)] for (d,) in cur.fetchall()]
+        if not header:
+            return []
+        out = []
+        for values in rows:
+            if not any(str(v).strip() for v in values):
+                continue
+            values = (values + [""] * len(header))[:len(header)]
+            out.append(dict(zip(header, numericise_all(values))))
+        return out
+
+    def rows_since(self, key: str, after_row: int = 1) -> List[Tuple[int, List[str]]]:
+        """after_row 다음부터의 (행 번호, 값 목록). 아직 전송되지 않은 행은 제외합니다."""
+        with self._lock:
+            cur = self._conn.execute(
+                "SELECT row_num, data FROM rows WHERE sheet=? AND row_num>? ORDER BY row_num",
+                (key, after_row))
+            return [(n, json.loads(d)) for n, d in cur.fetchall()]
+
+    def cursor(self, name: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT row_num FROM cursors WHERE name=?", (name,)).fetchone()
+        return row[0] if row else 1
+
+    def set_cursor(self, name: str, row_num: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cursors (name, row_num) VALUES (?,?)", (name, row_num))
+
+    # ---- 동기화 ----
+    def sync(self, key: str, open_ws: Callable[[], Any], force: bool = False,
+             change_token: Optional[Callable[[], Optional[str]]] = None) -> int:
+        """
+        마지막 동기화 이후 시트에 추가된 행만 받아옵니다. 새로 받은 행 수를 반환합니다.
+        change_token()(예: 스프레드시트 수정 시각)이 지난 동기화 때와 같으면 행 조회를 건너뜁니다.
+        값이 바뀌었을 때 마지막으로 받은 행이 시트에서 비어 있으면 행이 삭제된 것이므로 처음부터 다시 받습니다.
+        쿼터 초과로 실패하면 기존 로컬 데이터를 그대로 사용합니다.
+        네트워크 조회와 백오프 대기는 잠금 밖에서 하므로 그동안에도 다른 세션의 읽기·쓰기는 막히지 않고,
+        같은 시트를 이미 다른 세션이 받고 있으면 그 결과를 기다리거나(로컬 데이터가 없을 때) 바로 돌아갑니다.
+        """
+        if not force and not self.needs_sync(key):
+            return 0
+        with self._lock:
+            running = self._inflight.get(key)
+            if running is None:
+                self._inflight[key] = threading.Event()
+        if running is not None:
+            if self._meta_header(key) is None:
+                running.wait()
+            return 0
+        try:
+            return self._sync(key, open_ws, force, change_token)
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def _meta_header(self, key: str):
+        with self._lock:
+            return self._meta(key)[0]
+
+    def _sync(self, key: str, open_ws: Callable[[], Any], force: bool,
+              change_token: Optional[Callable[[], Optional[str]]]) -> int:
+        # 수정 시각 조회(네트워크)는 잠금 밖에서
+        token = change_token() if change_token is not None else None
+        with self._lock:
+            header, synced_row, synced_at = self._meta(key)
+            if not force and time.time() - synced_at < self.sync_ttl:
+                return 0
+            if not force and token is not None and header and token == self._token(key):
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE meta SET synced_at=? WHERE sheet=?", (time.time(), key))
+                return 0
+        known_header = header is not None
+        # 이미 받은 행이 있으면 마지막 행도 같은 요청으로 다시 받아, 시트에서 행이 지워졌는지 확인
+        check = known_header and synced_row > 1
+
+        for wait in (0, 1, 2, 4, 8):
+            try:
+                time.sleep(wait)
+                ws = open_ws()
+                if not header:
+                    header = ws.row_values(1)
+                    synced_row = 1
+                if not header:
+                    return 0
+                end_col = re.sub(r"\d", "", rowcol_to_a1(1, len(header)))
+                values = ws.get_values(f"A{synced_row + (0 if check else 1)}:{end_col}")
+                break
+            except gspread.exceptions.APIError as e:
+                if not is_quota_error(e):
+                    raise
+        else:
+            return 0
+
+        if check:
+            last, values = (values[0] if values else []), values[1:]
+            if not any(str(v).strip() for v in last):
+                # 마지막으로 받은 행이 비었음 = 그 위에서 행이 삭제됨: 처음부터 다시 받음
+                self.reset(key)
+                return self._sync(key, open_ws, True, lambda: token)
+
+        with self._lock:
+            cur_header, cur_row, _ = self._meta(key)
+            if known_header and cur_header is None:
+                return 0   # 받는 동안 reset()됨: 다음 동기화에서 처음부터 다시 받음
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO rows (sheet, row_num, data) VALUES (?,?,?)",
+                    [(key, synced_row + 1 + n, json.dumps(v, ensure_ascii=False))
+                     for n, v in enumerate(values)])
+                # 받는 동안 앱이 기록한 행(append_local)으로 이미 더 전진했을 수 있음
+                self._set_meta(key, header, max(cur_row, synced_row + len(values)),
+                               time.time(), token)
+            if values:
+                self._bump(key)
+            return len(values)
+
+    # ---- 쓰기 ----
+    def append_local(self, key: str, row: List[Any], row_num: Optional[int] = None,
+                     bump: bool = True):
+        """시트에 기록한 행을 로컬에도 반영합니다 (row_num을 모르면 마지막 행 다음으로)."""
+        with self._lock:
+            header, synced_row, synced_at = self._meta(key)
+            if row_num is None:
+                cur = self._conn.execute(
+                    "SELECT COALESCE(MAX(row_num), ?) FROM rows WHERE sheet=?", (synced_row, key))
+                row_num = max(cur.fetchone()[0], synced_row) + 1
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rows (sheet, row_num, data) VALUES (?,?,?)",
+                    (key, row_num, json.dumps([_cell(v) for v in row], ensure_ascii=False)))
+                # 빈틈 없이 이어지는 행이면 동기화 지점도 함께 전진
+                if row_num == synced_row + 1 and header:
+                    self._set_meta(key, header, row_num, synced_at)
+            if bump:
+                self._bump(key)
+
+    def set_cells(self, key: str, updates: Dict[int, Dict[int, Any]]):
+        """시트에서 직접 고친 셀을 로컬에도 반영합니다. updates: {행 번호: {열 번호(0부터): 값}}."""
+        with self._lock:
+            with self._conn:
+                for row_num, cells in updates.items():
+                    cur = self._conn.execute(
+                        "SELECT data FROM rows WHERE sheet=? AND row_num=?", (key, row_num))
+                    found = cur.fetchone()
+                    if not found:
+                        continue
+                    values = json.loads(found[0])
+                    values += [""] * (max(cells) + 1 - len(values))
+                    for col, v in cells.items():
+                        values[col] = _cell(v)
+                    self._conn.execute(
+                        "UPDATE rows SET data=? WHERE sheet=? AND row_num=?",
+                        (json.dumps(values, ensure_ascii=False), key, row_num))
+            if updates:
+                self._bump(key)
+
+    def add_pending(self, key: str, row: List[Any]) -> int:
+        """전송 대기 행을 기록하고 id를 돌려줍니다. 읽기에는 바로 포함됩니다."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO pending (sheet, data) VALUES (?,?)",
+                (key, json.dumps(row, ensure_ascii=False)))
+            self._bump(key)
+            return cur.lastrowid
+
+    def pending_rows(self) -> Dict[str, List[Tuple[int, List[Any]]]]:
+        """시트별 전송 대기 행 [(id, row), …]."""
+        with self._lock:
+            cur = self._conn.execute("SELECT id, sheet, data FROM pending ORDER BY id")
+            out: Dict[str, List[Tuple[int, List[Any]]]] = {}
+            for pid, key, data in cur.fetchall():
+                out.setdefault(key, []).append((pid, json.loads(data)))
+        return out
+
+    def pending_sheet(self, pid: int) -> Optional[str]:
+        """아직 전송되지 않은 대기 행이면 그 시트 키, 전송이 끝났으면 None."""
+        with self._lock:
+            row = self._conn.execute("SELECT sheet FROM pending WHERE id=?", (pid,)).fetchone()
+        return row[0] if row else None
+
+    def confirm_pending(self, key: str, ids: List[int], rows: List[List[Any]],
+                        start_row: Optional[int] = None):
+        """전송이 끝난 대기 행을 실제 행 번호 위치로 옮깁니다."""
+        with self._lock:
+            with self._conn:
+                self._conn.executemany("DELETE FROM pending WHERE id=?", [(i,) for i in ids])
+            for n, row in enumerate(rows):
+                self.append_local(key, row, None if start_row is None else start_row + n, bump=False)
+            # append_rows와 이 확인 사이에 sync가 같은 행을 실제 행 번호로 받아 오면
+            # 잠깐 대기 행과 함께 두 번 보이므로, 그때 만든 캐시가 다시 만들어지도록 버전을 올림
+            if ids:
+                self._bump(key)
+
+    def reset(self, key: str):
+        """
+        행 삭제 등으로 로컬 미러가 어긋났을 때 전체를 다시 받도록 초기화.
+        아직 전송되지 않은 대기 행은 시트에 없는 데이터이므로 그대로 둡니다.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM rows WHERE sheet=?", (key,))
+            self._conn.execute("DELETE FROM meta WHERE sheet=?", (key,))
+            self._bump(key)
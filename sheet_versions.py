@@ -0,0 +1,53 @@
+# sheet_versions.py 스프레드시트 변경 감지 (Drive 수정 시각, 짧은 TTL)
+import logging, threading, time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+DRIVE_FILE_URL = "https://www.googleapis.com/drive/v3/files/{}"
+PROBE_TTL = 10   # 초: 이 시간 안에는 수정 시각을 다시 묻지 않음
+
+
+def _get(client: Any, url: str, params: Dict[str, str]):
+    """gspread 클라이언트의 인증된 세션으로 GET 요청 (gspread 6은 http_client, 5는 client 자체)."""
+    http = getattr(client, "http_client", client)
+    return http.request("get", url, params=params)
+
+
+class SheetVersions:
+    """
+    스프레드시트 파일의 마지막 수정 시각(Drive modifiedTime)을 짧은 TTL로 캐시합니다.
+    같은 스프레드시트의 여러 시트는 조회 한 번을 함께 쓰고, 값이 지난 동기화 때와 같으면
+    SheetStore.sync가 행 조회를 건너뜁니다. 조회에 실패하면 None (평소대로 동기화).
+    """
+
+    def __init__(self, client_factory: Callable[[], Any], ttl: float = PROBE_TTL):
+        self.client_factory = client_factory
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, Tuple[Optional[str], float]] = {}   # ID → (수정 시각, 조회 시각)
+
+    def token(self, spreadsheet_id: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            cached = self._tokens.get(spreadsheet_id)
+        if cached and now - cached[1] < self.ttl:
+            return cached[0]
+        try:
+            resp = _get(self.client_factory(), DRIVE_FILE_URL.format(spreadsheet_id),
+                        {"fields": "modifiedTime", "supportsAllDrives": "true"})
+            token = resp.json().get("modifiedTime")
+        except Exception as e:
+            log.warning("수정 시각 조회 실패 (%s): %s", spreadsheet_id, e)
+            token = None
+        with self._lock:
+            self._tokens[spreadsheet_id] = (token, now)
+        return token
+
+    def invalidate(self, spreadsheet_id: Optional[str] = None):
+        """다음 token() 호출 때 다시 조회하도록 캐시를 비웁니다."""
+        with self._lock:
+            if spreadsheet_id is None:
+                self._tokens.clear()
+            else:
+                self._tokens.pop(spreadsheet_id, None)
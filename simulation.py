@@ -0,0 +1,51 @@
+# simulation.py 광고 효과(Power 모델) what-if 계산
+import numpy as np
+
+UNIT_WON = 10000             # 광고비 1단위 (만 원)
+TARGET_VIEWS = 1_000_000     # 목표 조회수
+
+# 기본 격자 (3차시 슬라이더 범위와 같게)
+DEFAULT_BUDGETS = np.arange(0, 5_000_001, 250_000)
+DEFAULT_GAMMAS = np.round(np.arange(0.5, 20.01, 0.5), 2)
+DEFAULT_PS = np.round(np.arange(1.0, 3.01, 0.25), 2)
+
+
+def ad_uplift(budget, gamma, p) -> np.ndarray:
+    """γ × units^p (units = 광고비 // 1만 원), 배열끼리 브로드캐스트."""
+    units = np.asarray(budget) // UNIT_WON
+    return np.asarray(gamma) * np.power(units, np.asarray(p, dtype=float))
+
+
+def time_views(a: float, b: float, c: float, hour) -> np.ndarray:
+    """시간 모델 np.poly1d([a, b, c]) 예측 (만 단위 → 원 단위)."""
+    return np.poly1d([a, b, c])(np.asarray(hour, dtype=float)) * 10000
+
+
+def whatif_grid(a: float, b: float, c: float, hour: float,
+                budgets=DEFAULT_BUDGETS, gammas=DEFAULT_GAMMAS, ps=DEFAULT_PS) -> np.ndarray:
+    """광고비 × γ × p 격자 전체의 통합 예측 조회수 (shape: 광고비, γ, p)."""
+    budgets = np.asarray(budgets)[:, None, None]
+    gammas = np.asarray(gammas)[None, :, None]
+    ps = np.asarray(ps)[None, None, :]
+    return time_views(a, b, c, hour) + ad_uplift(budgets, gammas, ps)
+
+
+def budget_for_target(a: float, b: float, c: float, hour: float,
+                      gammas=DEFAULT_GAMMAS, ps=DEFAULT_PS,
+                      target: float = TARGET_VIEWS) -> np.ndarray:
+    """
+    hour 시점까지 target 조회수에 도달하는 데 필요한 최소 광고비(원), shape: (γ, p).
+    광고 없이도 도달하면 0, γ가 0이라 도달할 수 없으면 inf.
+    """
+    gammas = np.asarray(gammas, dtype=float)[:, None]
+    ps = np.asarray(ps, dtype=float)[None, :]
+    need = np.maximum(target - time_views(a, b, c, hour), 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        units = np.ceil(np.power(need / gammas, 1.0 / ps))
+        # 부동소수점 오차 보정: 한 단위 적게 써도 되면 내리고, 모자라면 올림
+        units = np.where(gammas * np.power(np.maximum(units - 1, 0), ps) >= need,
+                         np.maximum(units - 1, 0), units)
+        units = np.where(gammas * np.power(units, ps) >= need, units, units + 1)
+    units = np.where(need <= 0, 0.0, units)
+    units = np.where((need > 0) & (gammas <= 0), np.inf, units)
+    return units * UNIT_WON
@@ -0,0 +1,175 @@
+# teacher_digest.py 교사용 제출물 일괄 요약 (여러 행을 한 요청에 묶기, 반·조별 종합)
+import json, logging, re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from gpt_jobs import estimate_tokens
+
+log = logging.getLogger(__name__)
+
+BATCH_TOKENS = 3000      # 요청 한 번에 넣을 제출물 토큰 상한 (추정치)
+ENTRY_CHARS = 1200       # 한 제출물에서 요약에 쓰는 최대 글자 수
+ROW_SUMMARY_TOKENS = 60  # 행 하나의 요약 응답 토큰 추정치
+DIGEST_TOKENS = 400
+MAX_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    """제출 시트의 열 위치 (0부터)."""
+    group_col: Optional[int]   # 반-조(세션) 열, None이면 시트 전체를 하나로 종합
+    text_col: int              # 학생이 쓴 원문
+    summary_col: int           # GPT 요약
+
+
+# safe_append로 기록하는 행 구성과 같게
+SHEET_LAYOUTS = {
+    "적합도평가":   SheetLayout(group_col=0, text_col=2, summary_col=3),   # [세션, 시각, 의견, 요약]
+    "영상선택기준": SheetLayout(group_col=None, text_col=2, summary_col=3), # [학번, 시각, 기준, 요약]
+    "토의요약":     SheetLayout(group_col=0, text_col=3, summary_col=4),   # [세션, 역할, 시각, 대본, 요약]
+}
+
+
+@dataclass
+class Entry:
+    row_num: int
+    group: str
+    text: str
+    summary: str = ""
+
+
+@dataclass
+class DigestResult:
+    sheet: str
+    entries: List[Entry]
+    new_summaries: Dict[int, str] = field(default_factory=dict)   # 행 번호 → 이번에 만든 요약
+    digests: Dict[str, str] = field(default_factory=dict)         # 반·조 → 종합
+    requests: int = 0
+    errors: List[str] = field(default_factory=list)               # 실패한 요청 (요약을 못 받은 행은 다음에 다시 처리)
+
+
+def _col(values: List[str], i: int) -> str:
+    return str(values[i]).strip() if i < len(values) else ""
+
+
+def entries_from_rows(rows: List[Tuple[int, List[str]]], layout: SheetLayout) -> List[Entry]:
+    out = []
+    for row_num, values in rows:
+        text = _col(values, layout.text_col)
+        if text:
+            group = "전체" if layout.group_col is None else _col(values, layout.group_col)
+            out.append(Entry(row_num, group or "(미지정)",
+                             text, _col(values, layout.summary_col)))
+    return out
+
+
+def pack_batches(entries: List[Entry], budget: int = BATCH_TOKENS) -> List[List[Entry]]:
+    """토큰 상한 안에서 제출물을 순서대로 묶습니다 (하나가 상한을 넘으면 단독 묶음)."""
+    batches, cur, used = [], [], 0
+    for e in entries:
+        cost = len(e.text[:ENTRY_CHARS]) + ROW_SUMMARY_TOKENS + 8
+        if cur and used + cost > budget:
+            batches.append(cur)
+            cur, used = [], 0
+        cur.append(e)
+        used += cost
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def batch_messages(batch: List[Entry]) -> List[Dict[str, str]]:
+    body = "\n\n".join(f"[{e.row_num}] {e.text[:ENTRY_CHARS]}" for e in batch)
+    return [
+        {"role": "system", "content": "당신은 수업 토의 내용을 간결히 요약하는 AI입니다."},
+        {"role": "user", "content":
+            "아래 학생 제출물을 각각 한두 문장으로 요약해 주세요. "
+            "대괄호 안 번호를 키로 하는 JSON 객체만 출력하세요. 예: {\"12\": \"요약\"}\n\n" + body},
+    ]
+
+
+def parse_batch(text: str, batch: List[Entry]) -> Dict[int, str]:
+    """모델 응답(JSON)에서 행 번호별 요약을 꺼냅니다. 형식이 깨진 항목은 빠집니다."""
+    m = re.search(r"\{.*\}", text, re.S)
+    try:
+        data = json.loads(m.group(0)) if m else {}
+    except ValueError:
+        data = {}
+    wanted = {str(e.row_num) for e in batch}
+    return {int(k): str(v).strip() for k, v in data.items() if str(k) in wanted and str(v).strip()}
+
+
+def digest_messages(group: str, summaries: List[str]) -> List[Dict[str, str]]:
+    body = "\n".join(f"- {s}" for s in summaries)
+    return [
+        {"role": "system", "content": "당신은 수업 토의 내용을 간결히 요약하는 AI입니다."},
+        {"role": "user", "content":
+            f"'{group}' 학생들의 제출 요약입니다. 공통 의견, 서로 다른 관점, "
+            f"교사가 짚어 줄 만한 오개념을 5줄 이내로 정리해 주세요.\n\n{body}"},
+    ]
+
+
+class BatchSummarizer:
+    """
+    새로 들어온 제출물을 여러 개씩 묶어 요약하고(행별 요약이 없는 행만),
+    반·조별로 한 번씩 종합합니다. chat(messages, **params) → 응답 텍스트.
+    """
+
+    def __init__(self, chat: Callable[..., str], budget: int = BATCH_TOKENS,
+                 max_workers: int = MAX_WORKERS):
+        self.chat = chat
+        self.budget = budget
+        self.max_workers = max_workers
+
+    def _ask(self, messages: List[Dict[str, str]], max_tokens: int) -> Tuple[Optional[str], str]:
+        """(응답, 오류). 요청 하나가 실패해도 나머지 결과는 살리도록 예외를 돌려줍니다."""
+        try:
+            return self.chat(messages, temperature=0.3, max_tokens=max_tokens), ""
+        except Exception as e:
+            log.warning("일괄 요약 요청 실패: %s", e)
+            return None, str(e)
+
+    def run(self, sheet: str, entries: List[Entry]) -> DigestResult:
+        result = DigestResult(sheet, entries)
+        todo = [e for e in entries if not e.summary]
+        batches = pack_batches(todo, self.budget)
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            replies = pool.map(
+                lambda b: self._ask(batch_messages(b), ROW_SUMMARY_TOKENS * len(b) + 50),
+                batches)
+            for batch, (reply, error) in zip(batches, replies):
+                if error:
+                    result.errors.append(f"행 {batch[0].row_num}–{batch[-1].row_num} 요약: {error}")
+                    continue
+                parsed = parse_batch(reply, batch)
+                if len(parsed) < len(batch):
+                    result.errors.append(f"행 {batch[0].row_num}–{batch[-1].row_num} 중 "
+                                         f"{len(batch) - len(parsed)}건은 응답에서 요약을 찾지 못함")
+                result.new_summaries.update(parsed)
+        result.requests += len(batches)
+        for e in todo:
+            e.summary = result.new_summaries.get(e.row_num, "")
+
+        groups: Dict[str, List[str]] = {}
+        for e in entries:
+            groups.setdefault(e.group, []).append(e.summary or e.text[:200])
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            names = sorted(groups)
+            replies = pool.map(lambda g: self._ask(digest_messages(g, groups[g]), DIGEST_TOKENS), names)
+            for name, (reply, error) in zip(names, replies):
+                if error:
+                    result.errors.append(f"'{name}' 종합: {error}")
+                else:
+                    result.digests[name] = reply
+        result.requests += len(groups)
+        return result
+
+
+def estimate_cost(entries: List[Entry], budget: int = BATCH_TOKENS) -> Tuple[int, int]:
+    """(요청 수, 대략적인 토큰 수) 미리 보기."""
+    todo = [e for e in entries if not e.summary]
+    batches = pack_batches(todo, budget)
+    groups = {e.group for e in entries}
+    tokens = sum(estimate_tokens(batch_messages(b), ROW_SUMMARY_TOKENS * len(b)) for b in batches)
+    return len(batches) + len(groups), tokens + DIGEST_TOKENS * len(groups)
@@ -0,0 +1,108 @@
+# tests/test_regression.py 세 점 조합 순번·증분 재적합 검사
+from itertools import combinations
+from math import comb
+
+import numpy as np
+import pytest
+
+from regression import (IncrementalFit, best_curve_triple, best_triple, curve_mse, fit_triples,
+                        increasing_mask, iter_pairs, iter_triples, sampled_triples, unrank_triples)
+
+
+def _triples(I, J, K):
+    return list(zip(I.tolist(), J.tolist(), K.tolist()))
+
+
+def _rank(n, i, j, k):
+    """combinations(range(n), 3)에서 (i, j, k)의 순번 (검산용)."""
+    return (comb(n, 3) - comb(n - i, 3)
+            + comb(n - i - 1, 2) - comb(n - j, 2)
+            + (k - j - 1))
+
+
+@pytest.mark.parametrize("n", range(0, 25))
+def test_unrank_triples_matches_combinations(n):
+    I, J, K = unrank_triples(n, np.arange(comb(n, 3)))
+    assert _triples(I, J, K) == list(combinations(range(n), 3))
+
+
+def test_unrank_triples_large_n():
+    # 부동소수 보정이 필요한 큰 n에서도 순번 ↔ 조합이 정확히 대응
+    n = 5000
+    rng = np.random.default_rng(0)
+    ranks = np.concatenate([[0, comb(n, 3) - 1], rng.integers(0, comb(n, 3), 2000)])
+    I, J, K = unrank_triples(n, ranks)
+    assert np.all((I < J) & (J < K) & (K < n))
+    assert [_rank(n, *t) for t in _triples(I, J, K)] == ranks.tolist()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 17, None])
+def test_iter_triples_chunks_match_combinations(chunk_size):
+    n = 12
+    out = [t for chunk in iter_triples(n, chunk_size) for t in _triples(*chunk)]
+    assert out == list(combinations(range(n), 3))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 17, None])
+def test_iter_pairs_chunks_match_combinations(chunk_size):
+    m = 13
+    out = [t for I, J in iter_pairs(m, chunk_size) for t in zip(I.tolist(), J.tolist())]
+    assert out == list(combinations(range(m), 2))
+
+
+def test_sampled_triples_exact_budget_distinct_and_ordered():
+    n, budget = 200, 5000
+    I, J, K = sampled_triples(n, budget, seed=7)
+    triples = _triples(I, J, K)
+    assert len(triples) == budget
+    assert len(set(triples)) == budget
+    assert triples == sorted(triples)   # combinations() 순서
+    assert triples == _triples(*sampled_triples(n, budget, seed=7))
+
+
+def test_sampled_triples_small_n_returns_all():
+    n = 10
+    assert _triples(*sampled_triples(n, budget=10_000)) == list(combinations(range(n), 3))
+
+
+def _views(n, seed):
+    rng = np.random.default_rng(seed)
+    x = np.cumsum(rng.uniform(600, 3600, n))
+    y = 2e-6 * x**2 + 5 * x + 1e4 + rng.normal(0, 2e3, n)
+    return x, y
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_best_curve_triple_matches_brute_force(seed):
+    x, y = _views(25, seed)
+    I, J, K = (np.array(v) for v in zip(*combinations(range(len(x)), 3)))
+    a, b, c = fit_triples(x, y, I, J, K)
+    ok = increasing_mask(a, b, c, x[I], x[K])
+    mses = [curve_mse(x, y, t) if keep else np.inf
+            for t, keep in zip(_triples(I, J, K), ok)]
+    pos = int(np.argmin(mses))
+    found = best_curve_triple(x, y, chunk_size=50)
+    assert found[0] == _triples(I, J, K)[pos]
+    assert found[1] == pytest.approx(mses[pos], rel=1e-6)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_fit_matches_full_search(seed):
+    x, y = _views(40, seed)
+    fit = IncrementalFit(chunk_size=7)
+    for n in range(1, len(x) + 1):
+        fit.sync(x[:n], y[:n])
+        assert fit.best == best_triple(x[:n], y[:n], chunk_size=None)
+
+
+def test_incremental_fit_rebuilds_when_prefix_changes():
+    x, y = _views(30, 1)
+    fit = IncrementalFit()
+    assert fit.sync(x, y) == len(x)
+    assert fit.sync(x, y) == 0
+    y2 = y.copy()
+    y2[3] += 5e4   # 앞쪽 기록이 고쳐지면 처음부터 다시 계산
+    assert fit.sync(x, y2) == len(x)
+    assert fit.best == best_triple(x, y2)
+    assert fit.sync(x[:20], y2[:20]) == 20   # 기록이 줄어도 다시 계산
+    assert fit.best == best_triple(x[:20], y2[:20])
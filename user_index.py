@@ -0,0 +1,56 @@
+# user_index.py 학번 → 회원 정보 색인
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def normalize_sid(value: Any) -> str:
+    """'20301, 20301, 20301.0, ' 20301 ', '020301 을 모두 같은 '20301'로 맞춥니다 (로그인의 int 비교와 같게)."""
+    sid = str(value).strip().lstrip("'").strip()
+    if sid.endswith(".0") and sid[:-2].isdigit():
+        sid = sid[:-2]
+    if sid.isdigit():
+        sid = str(int(sid))
+    return sid
+
+
+class UserIndex:
+    """
+    users 시트 레코드를 정규화된 학번으로 색인합니다.
+    시트 버전이 바뀔 때만 다시 만들고, 회원가입은 색인에 바로 추가합니다.
+    """
+
+    def __init__(self):
+        self._by_sid: Dict[str, Dict[str, Any]] = {}
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def ensure(self, version: int, load: Callable[[], Iterable[Dict[str, Any]]]):
+        """버전이 달라졌으면 load()로 전체 색인을 다시 만듭니다."""
+        with self._lock:
+            if self._version == version:
+                return
+            by_sid = {}
+            for r in load():
+                sid = normalize_sid(r.get("학번", ""))
+                if sid:
+                    by_sid.setdefault(sid, r)
+            self._by_sid, self._version = by_sid, version
+
+    def add(self, record: Dict[str, Any], version: Optional[int] = None):
+        """
+        새로 가입한 회원을 색인에 추가합니다.
+        색인이 바로 직전 버전이었다면 추가 후 버전(version)을 그대로 이어받아 재구성을 건너뜁니다.
+        """
+        with self._lock:
+            self._by_sid.setdefault(normalize_sid(record.get("학번", "")), record)
+            if version is not None and self._version is not None and version == self._version + 1:
+                self._version = version
+
+    def get(self, sid: Any) -> Optional[Dict[str, Any]]:
+        return self._by_sid.get(normalize_sid(sid))
+
+    def __contains__(self, sid: Any) -> bool:
+        return normalize_sid(sid) in self._by_sid
+
+    def __len__(self) -> int:
+        return len(self._by_sid)
@@ -0,0 +1,153 @@
+# view_data.py 학생별 조회수 기록 (파싱·정렬된 DataFrame 캐시)
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from user_index import normalize_sid
+
+
+# safe_append가 쓰는 형식을 먼저, 그다음 시트 표시 형식(한국어·영어 로캘)
+TIMESTAMP_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y. %m. %d %H:%M:%S",
+    "%Y. %m. %d %p %I:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %I:%M:%S %p",
+    "%Y-%m-%d",
+]
+
+
+def normalize_timestamps(values: pd.Series) -> pd.Series:
+    """공백·하이픈 정리, 오전/오후 → AM/PM."""
+    return (
+        values
+        .astype(str)
+        .str.replace(r'\s*-\s*','-',regex=True)
+        .str.replace(r'\s+',' ',regex=True)
+        .str.replace('오전','AM',regex=False)
+        .str.replace('오후','PM',regex=False)
+        .str.strip()
+    )
+
+
+def parse_timestamps(values: pd.Series) -> Tuple[pd.Series, List[str]]:
+    """
+    알려진 형식을 순서대로 적용해 한 번에(벡터화) 파싱합니다.
+    앞 형식으로 파싱되지 않은 값에만 다음 형식을 시도하고, 끝까지 실패한 값은 NaT로 남깁니다.
+    반환값은 (파싱 결과, 실제로 사용된 형식 목록)입니다.
+    """
+    text = normalize_timestamps(values)
+    parsed = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+    used = []
+    for fmt in TIMESTAMP_FORMATS:
+        todo = parsed.isna()
+        if not todo.any():
+            break
+        attempt = pd.to_datetime(text[todo], format=fmt, errors='coerce')
+        if attempt.notna().any():
+            parsed[todo] = attempt
+            used.append(fmt)
+    return parsed, used
+
+
+def parse_view_records(records: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    youtube 시트 레코드 → 소문자 컬럼, datetime timestamp, int viewcount, 시간순 정렬.
+    timestamp나 viewcount를 읽을 수 없는 행은 예외 대신 (정상 행, 격리 행) 중 격리 행으로 돌려줍니다.
+    """
+    df = pd.DataFrame(records)
+    df.columns = df.columns.str.strip().str.lower()
+    raw = df.copy()
+    df['timestamp'], _ = parse_timestamps(df['timestamp'])
+    df['viewcount'] = pd.to_numeric(df['viewcount'], errors='coerce')
+
+    bad_ts = df['timestamp'].isna()
+    bad_vc = df['viewcount'].isna()
+    bad = bad_ts | bad_vc
+    quarantined = raw[bad].assign(
+        reason=np.where(bad_ts[bad], "timestamp 형식 오류", "viewcount 형식 오류"))
+
+    df = df[~bad].copy()
+    df['viewcount'] = df['viewcount'].astype(int)
+    # 같은 시각의 행은 시트 순서 유지 (정렬이 흔들리면 IncrementalFit이 매번 처음부터 다시 계산)
+    return df.sort_values('timestamp', kind='stable').reset_index(drop=True), quarantined.reset_index(drop=True)
+
+
+def _signature(rows: List[Dict[str, Any]]) -> Tuple:
+    return tuple(tuple(r.values()) for r in rows)
+
+
+class ViewPartitions:
+    """
+    youtube 시트 기록을 학번별로 나눠, 파싱·정렬된 DataFrame을 보관합니다.
+    시트 버전이 바뀌면 학번별로 다시 묶기만 하고, 기록이 달라진 학생만 다시 파싱합니다.
+    """
+
+    def __init__(self, parse: Callable[[List[Dict[str, Any]]], Tuple[pd.DataFrame, pd.DataFrame]]
+                 = parse_view_records):
+        self._parse = parse
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._by_video: Dict[str, Dict[str, pd.DataFrame]] = {}
+        self._sigs: Dict[str, Tuple] = {}
+        self._bad: Dict[str, pd.DataFrame] = {}
+
+    def ensure(self, version: int, load: Callable[[], Iterable[Dict[str, Any]]]):
+        with self._lock:
+            if self._version == version:
+                return
+            groups: Dict[str, List[Dict[str, Any]]] = {}
+            for r in load():
+                sid = normalize_sid(r.get('학번', ''))
+                if sid:
+                    groups.setdefault(sid, []).append(r)
+            for sid in list(self._frames):
+                if sid not in groups:
+                    self._drop(sid)
+            for sid, rows in groups.items():
+                sig = _signature(rows)
+                if self._sigs.get(sid) == sig:
+                    continue
+                df, bad = self._parse(rows)
+                self._frames[sid] = df
+                self._bad[sid] = bad
+                self._by_video[sid] = {
+                    str(vid): part.reset_index(drop=True)
+                    for vid, part in df.groupby('video_id', sort=False)
+                } if 'video_id' in df.columns else {}
+                self._sigs[sid] = sig
+            self._version = version
+
+    def _drop(self, sid: str):
+        self._frames.pop(sid, None)
+        self._by_video.pop(sid, None)
+        self._sigs.pop(sid, None)
+        self._bad.pop(sid, None)
+
+    def get(self, sid: Any, video_id: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """학번(과 video_id)의 기록. 없으면 None. 반환된 DataFrame은 수정하지 마세요."""
+        sid = normalize_sid(sid)
+        if video_id is None:
+            return self._frames.get(sid)
+        return self._by_video.get(sid, {}).get(str(video_id))
+
+    def quarantined(self, sid: Any) -> Optional[pd.DataFrame]:
+        """파싱하지 못해 제외된 행과 그 이유 (없으면 None)."""
+        bad = self._bad.get(normalize_sid(sid))
+        return bad if bad is not None and not bad.empty else None
+
+    def videos(self, sid: Any) -> List[str]:
+        return list(self._by_video.get(normalize_sid(sid), {}))
+
+    def groups(self) -> Iterator[Tuple[str, str, pd.DataFrame]]:
+        """
+        (학번, 기록한 video_id 목록, 학번의 전체 기록). 교사용 일괄 분석에서 씁니다.
+        학생 화면(student_views(sid))처럼 영상 구분 없이 학번별 전체 기록으로 묶습니다.
+        """
+        for sid, df in list(self._frames.items()):
+            yield sid, ", ".join(self._by_video.get(sid, {})), df
@@ -0,0 +1,143 @@
+# youtube_client.py YouTube Data API 클라이언트 (연결 재사용·묶음 조회·쿼터 대응)
+import threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_BASE = "https://www.googleapis.com/youtube/v3"
+MAX_IDS = 50            # id= 한 번에 넣을 수 있는 최대 ID 수
+TIMEOUT = (3.05, 10)    # (연결, 응답) 초
+CHANNEL_TTL = 3600      # 초: 채널 구독자 수 캐시 유지 시간
+RETRY_WAITS = (0, 1, 2, 4, 8)
+MAX_RETRY_TIME = 15.0   # 초: 한 요청의 재시도를 포함한 총 시간 상한 (화면에서 기다리는 조회용)
+# 잠시 기다리면 풀리는 오류 (일일 쿼터 소진 quotaExceeded는 재시도하지 않음)
+RETRY_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+MAX_WORKERS = 8         # 50개 묶음이 여러 개일 때 동시에 보낼 요청 수
+
+
+class QuotaExceeded(Exception):
+    """YouTube Data API 일일 쿼터 소진."""
+
+
+def chunked(ids: Iterable[str], size: int = MAX_IDS) -> Iterator[List[str]]:
+    """중복을 없앤 ID 목록을 size개씩 나눕니다."""
+    ids = list(dict.fromkeys(i for i in ids if i))
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _error_reason(resp: requests.Response) -> str:
+    try:
+        return resp.json()["error"]["errors"][0].get("reason", "")
+    except (ValueError, KeyError, IndexError, TypeError):
+        return ""
+
+
+class YouTubeClient:
+    """
+    하나의 requests.Session으로 연결을 재사용하고, 영상·채널 ID를 50개씩 묶어 조회합니다.
+    채널 구독자 수는 프로세스 안에서 공유 캐시로 보관합니다 (같은 채널을 고르는 학생이 많음).
+    """
+
+    def __init__(self, api_key: str, timeout=TIMEOUT, channel_ttl: float = CHANNEL_TTL,
+                 max_retry_time: float = MAX_RETRY_TIME):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retry_time = max_retry_time
+        self.channel_ttl = channel_ttl
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        self._subs: Dict[str, tuple] = {}     # channel_id → (구독자 수, 만료 시각)
+        self._lock = threading.Lock()
+
+    # ---- 저수준 호출 ----
+    def _get(self, resource: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        params = {**params, "key": self.api_key}
+        resp = None
+        deadline = time.monotonic() + self.max_retry_time
+        for wait in RETRY_WAITS:
+            # 기다렸다가 한 번 더 보내면 상한을 넘길 것 같으면 재시도를 멈춤
+            if wait and time.monotonic() + wait + self.timeout[0] > deadline:
+                break
+            time.sleep(wait)
+            try:
+                resp = self.session.get(f"{API_BASE}/{resource}", params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                continue
+            if resp.status_code == 200:
+                return resp.json()
+            reason = _error_reason(resp)
+            if reason == "quotaExceeded":
+                raise QuotaExceeded("YouTube API 일일 쿼터를 모두 사용했습니다.")
+            if resp.status_code in (429, 500, 503) or reason in RETRY_REASONS:
+                continue
+            resp.raise_for_status()
+        if resp is None:
+            raise requests.ConnectionError(f"YouTube API 연결 실패: {resource}")
+        resp.raise_for_status()
+        return resp.json()
+
+    def _items(self, resource: str, ids: Iterable[str], part: str) -> Dict[str, Dict[str, Any]]:
+        chunks = list(chunked(ids))
+        fetch = lambda chunk: self._get(resource, {"part": part, "id": ",".join(chunk)})
+        if len(chunks) > 1:
+            # 묶음이 여러 개면 세션 연결 풀을 나눠 쓰며 동시에 조회
+            with ThreadPoolExecutor(min(MAX_WORKERS, len(chunks))) as pool:
+                pages = list(pool.map(fetch, chunks))
+        else:
+            pages = [fetch(chunk) for chunk in chunks]
+        out: Dict[str, Dict[str, Any]] = {}
+        for data in pages:
+            for item in data.get("items", []):
+                out[item["id"]] = item
+        return out
+
+    # ---- 영상·채널 ----
+    def videos(self, video_ids: Iterable[str], part: str = "snippet,statistics") -> Dict[str, Dict[str, Any]]:
+        return self._items("videos", video_ids, part)
+
+    def channel_subscribers(self, channel_ids: Iterable[str]) -> Dict[str, int]:
+        """채널별 구독자 수 (캐시에 없거나 만료된 채널만 조회)."""
+        channel_ids = list(dict.fromkeys(channel_ids))
+        now = time.time()
+        with self._lock:
+            out = {c: self._subs[c][0] for c in channel_ids
+                   if c in self._subs and self._subs[c][1] > now}
+        missing = [c for c in channel_ids if c not in out]
+        if missing:
+            fetched = {cid: int(item["statistics"].get("subscriberCount", 0))
+                       for cid, item in self._items("channels", missing, "statistics").items()}
+            with self._lock:
+                for cid, subs in fetched.items():
+                    self._subs[cid] = (subs, now + self.channel_ttl)
+            out.update(fetched)
+        return out
+
+    def statistics(self, video_ids: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """여러 영상의 조회수·좋아요·댓글 수."""
+        out = {}
+        for vid, item in self.videos(video_ids, part="statistics").items():
+            stats = item["statistics"]
+            out[vid] = {
+                "viewCount": int(stats.get("viewCount", 0)),
+                "likeCount": int(stats.get("likeCount", 0)),
+                "commentCount": int(stats.get("commentCount", 0)),
+            }
+        return out
+
+    def video_details(self, video_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """영상 제목·게시일·조회수와 채널 구독자 수 (영상·채널을 각각 묶어서 조회)."""
+        items = self.videos(video_ids)
+        subs = self.channel_subscribers(item["snippet"]["channelId"] for item in items.values())
+        return {
+            vid: {
+                "title": item["snippet"]["title"],
+                "pub":   item["snippet"]["publishedAt"][:10],
+                "views": int(item["statistics"].get("viewCount", 0)),
+                "subs":  subs.get(item["snippet"]["channelId"], 0),
+            }
+            for vid, item in items.items()
+        }